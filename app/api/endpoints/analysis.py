@@ -6,10 +6,10 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional
 
 from app.models.pydantic_models import DocumentAnalysisResponse, RiskAssessmentResponse
-from app.services.document_service import DocumentAnalysisService
+from app.services.document_service import document_analysis_service
 
 router = APIRouter()
-document_service = DocumentAnalysisService()
+document_service = document_analysis_service
 
 
 @router.post("/{document_id}/analyze")
@@ -55,7 +55,7 @@ async def analyze_document(
         
         return {
             "document_id": document_id,
-            "analysis": analysis_result
+            "analysis": document_service.resolve_contexts(sample_content, analysis_result)
         }
         
     except Exception as e:
@@ -10,11 +10,11 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
 from fastapi.responses import JSONResponse
 
 from app.models.pydantic_models import DocumentResponse, DocumentUpload
-from app.services.document_service import DocumentAnalysisService
+from app.services.document_service import document_analysis_service
 from app.core.config import settings
 
 router = APIRouter()
-document_service = DocumentAnalysisService()
+document_service = document_analysis_service
 
 
 @router.post("/upload", response_model=dict)
@@ -61,7 +61,7 @@ async def upload_document(
             await f.write(contents)
         
         # Extract text content
-        text_content = await extract_text_from_file(file_path, file_extension)
+        text_content = await extract_text_from_file(file_path, file_extension, contents)
         
         # Create document record (in a real app, this would save to database)
         document_data = {
@@ -87,7 +87,7 @@ async def upload_document(
         return {
             "message": "Document uploaded successfully",
             "document": document_data,
-            "analysis": analysis_result
+            "analysis": document_service.resolve_contexts(text_content, analysis_result)
         }
         
     except Exception as e:
@@ -123,31 +123,28 @@ async def delete_document(document_id: int):
     }
 
 
-async def extract_text_from_file(file_path: str, file_extension: str) -> str:
-    """Extract text content from uploaded file."""
+async def extract_text_from_file(file_path: str, file_extension: str, contents: Optional[bytes] = None) -> str:
+    """Extract text content from uploaded file, decoding text files from contents when already read."""
     try:
         if file_extension == ".txt":
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                return await f.read()
+            if contents is None:
+                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+                    return await f.read()
+            # Same newline translation as reading the saved file in text mode
+            return contents.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
         
         elif file_extension == ".pdf":
             # Note: This is a simplified PDF extraction
             # In production, use more robust libraries like pymupdf or pdfplumber
             import PyPDF2
-            text = ""
             with open(file_path, 'rb') as f:
                 pdf_reader = PyPDF2.PdfReader(f)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+                return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
         
         elif file_extension == ".docx":
             import docx
             doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
         
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
@@ -29,6 +29,7 @@ Enhanced AI Legal Assistant with advanced features
 
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -126,6 +127,7 @@ async def startup_event():
     logger.info("Starting Legal Assistant GenAI application...")
     await ai_orchestrator.initialize()
     await document_processor.initialize()
+    await collaboration_manager.initialize()
     logger.info("Application startup complete")
 
 @app.on_event("shutdown")
@@ -134,6 +136,8 @@ async def shutdown_event():
     logger.info("Shutting down Legal Assistant GenAI application...")
     await ai_orchestrator.cleanup()
     await document_processor.cleanup()
+    await collaboration_manager.cleanup()
+    await integration_service.cleanup()
 
 # Health check endpoint
 @app.get("/health")
@@ -196,6 +200,7 @@ async def upload_document(
     try:
         user = await security_manager.validate_token(credentials.credentials)
         result = await document_processor.process_upload(file, user.id)
+        analytics_service.invalidate_dashboard_cache(user.id)
         
         return {
             "document_id": result.get("document_id"),
@@ -301,7 +306,7 @@ async def get_document_collaborators(
         raise HTTPException(status_code=500, detail="Failed to get collaborators")
 
 # Analytics endpoints
-@app.get("/analytics/dashboard")
+@app.get("/analytics/dashboard", response_class=ORJSONResponse)
 async def get_analytics_dashboard(
     time_period: str = "30_days",
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -315,7 +320,7 @@ async def get_analytics_dashboard(
         logger.error(f"Analytics dashboard error: {str(e)}")
         raise HTTPException(status_code=500, detail="Analytics data retrieval failed")
 
-@app.get("/analytics/risk-heatmap")
+@app.get("/analytics/risk-heatmap", response_class=ORJSONResponse)
 async def get_risk_heatmap(
     documents: List[str] = [],
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -332,7 +337,7 @@ async def get_risk_heatmap(
         logger.error(f"Risk heatmap error: {str(e)}")
         raise HTTPException(status_code=500, detail="Risk heatmap generation failed")
 
-@app.get("/analytics/negotiation-timeline/{contract_id}")
+@app.get("/analytics/negotiation-timeline/{contract_id}", response_class=ORJSONResponse)
 async def get_negotiation_timeline(
     contract_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -346,7 +351,7 @@ async def get_negotiation_timeline(
         logger.error(f"Negotiation timeline error: {str(e)}")
         raise HTTPException(status_code=500, detail="Timeline retrieval failed")
 
-@app.post("/analytics/find-precedents")
+@app.post("/analytics/find-precedents", response_class=ORJSONResponse)
 async def find_contract_precedents(
     contract_data: dict,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -363,7 +368,7 @@ async def find_contract_precedents(
         logger.error(f"Precedent search error: {str(e)}")
         raise HTTPException(status_code=500, detail="Precedent search failed")
 
-@app.post("/analytics/predictive")
+@app.post("/analytics/predictive", response_class=ORJSONResponse)
 async def get_predictive_analytics(
     contract_data: dict,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -426,12 +431,13 @@ async def sync_google_workspace(
 async def trigger_webhook(
     event_type: str,
     payload: dict,
+    batched: bool = False,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Trigger webhook for external notifications"""
     try:
         user = await security_manager.validate_token(credentials.credentials)
-        result = await integration_service.trigger_webhook(event_type, payload)
+        result = await integration_service.trigger_webhook(event_type, payload, batched=batched)
         return result
     except Exception as e:
         logger.error(f"Webhook trigger error: {str(e)}")
@@ -143,7 +143,7 @@ class AnalysisJob(Base):
 Pydantic schemas for Legal Assistant GenAI
 """
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
@@ -303,6 +303,8 @@ class CollaborationEvent(BaseModel):
 # Analytics Models
 class DocumentMetrics(BaseModel):
     """Document processing metrics"""
+    model_config = ConfigDict(frozen=True)
+    
     total_documents: int
     documents_by_type: Dict[DocumentType, int]
     average_processing_time: float
@@ -310,6 +312,8 @@ class DocumentMetrics(BaseModel):
 
 class UserActivity(BaseModel):
     """User activity metrics"""
+    model_config = ConfigDict(frozen=True)
+    
     documents_processed: int
     time_spent: float  # in hours
     most_used_features: List[str]
@@ -317,6 +321,8 @@ class UserActivity(BaseModel):
 
 class AnalyticsDashboard(BaseModel):
     """Analytics dashboard data"""
+    model_config = ConfigDict(frozen=True)
+    
     user_id: str
     time_period: str
     document_metrics: DocumentMetrics
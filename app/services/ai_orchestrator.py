@@ -4,11 +4,18 @@ Manages multiple AI providers and combines their responses
 """
 
 import asyncio
+import functools
 import json
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from app.models.schemas import (
     AIModel, AnalysisType, DocumentAnalysisResponse, 
@@ -17,196 +24,309 @@ from app.models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+RISK_KEYWORDS = ('risk', 'concern', 'issue', 'violation')
+
+# Demo document body used until a real document store is wired in
+_DEMO_TEMPLATE = "[Document {}] Sample legal contract content for analysis..."
+
 class AIProvider:
     """Base class for AI providers"""
     
+    model: AIModel = None
+    confidence_adjustment = 0.0
+    
+    # Mock responses keyed by analysis type; anything else gets the default
+    _MOCK_RESPONSES: Dict[AnalysisType, bytes] = {}
+    _DEFAULT_RESPONSE = "Analysis complete for {}."
+    
+    # Request bodies are pre-encoded, so they go out as data= with this header
+    # rather than json= (which would re-serialize with the stdlib encoder)
+    request_headers = {"Content-Type": "application/json"}
+    
     def __init__(self, model_name: str, api_key: str = None):
         self.model_name = model_name
         self.api_key = api_key
         self.rate_limit_delay = 1.0  # seconds between requests
         
+    def build_payload(self, document_text: str, analysis_type: AnalysisType,
+                      custom_instructions: str = None) -> Dict[str, Any]:
+        """Build the provider request payload"""
+        payload = {
+            "model": self.model_name,
+            "analysis_type": analysis_type.value,
+            "document": document_text,
+        }
+        if custom_instructions:
+            payload["instructions"] = custom_instructions
+        return payload
+        
+    @staticmethod
+    def encode_payload(payload: Dict[str, Any]) -> bytes:
+        """Serialize a request payload to JSON bytes"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload)
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        
+    async def _send_request(self, payload: bytes, delay: float) -> None:
+        """Simulate the provider API call carrying the encoded payload"""
+        # A real client posts data=payload with headers=self.request_headers
+        await asyncio.sleep(delay)
+        
     async def analyze_document(self, document_text: str, analysis_type: AnalysisType, 
                              custom_instructions: str = None) -> AIModelResponse:
         """Analyze document using this AI provider"""
         raise NotImplementedError
         
+    async def analyze_batch(self, document_texts: List[str], analysis_type: AnalysisType,
+                          custom_instructions: str = None) -> List[AIModelResponse]:
+        """Analyze several documents, returning responses in input order"""
+        # Providers with a batch endpoint override this to send one request
+        # carrying every prompt; the default fans out concurrently
+        return list(await asyncio.gather(*(
+            self.analyze_document(text, analysis_type, custom_instructions)
+            for text in document_texts
+        )))
+        
+    async def _generate_mock_response(self, document_text: str, analysis_type: AnalysisType,
+                                    custom_instructions: str = None) -> str:
+        """Generate mock response for demonstration"""
+        encoded = self._MOCK_RESPONSES.get(analysis_type)
+        if encoded is not None:
+            return encoded.decode("utf-8")
+        return self._DEFAULT_RESPONSE.format(analysis_type.value)
+        
     async def calculate_confidence(self, response: str, analysis_type: AnalysisType) -> float:
         """Calculate confidence score for the response"""
+        text = response.lower()
+        return self._score_confidence(
+            len(response),
+            any(keyword in text for keyword in RISK_KEYWORDS),
+            'uncertain' in text or '?' in response
+        )
+        
+    @staticmethod
+    def _score_confidence(length: int, has_risk_keyword: bool, is_uncertain: bool) -> float:
+        """Confidence heuristic shared by full and streamed responses"""
         # Simple heuristic-based confidence calculation
         # In production, this would use more sophisticated methods
         base_confidence = 0.7
         
         # Adjust based on response length and keywords
-        if len(response) > 100:
+        if length > 100:
             base_confidence += 0.1
-        if any(keyword in response.lower() for keyword in ['risk', 'concern', 'issue', 'violation']):
+        if has_risk_keyword:
             base_confidence += 0.05
-        if 'uncertain' in response.lower() or '?' in response:
+        if is_uncertain:
             base_confidence -= 0.1
             
         return min(max(base_confidence, 0.0), 1.0)
+        
+    async def stream_document(self, document_text: str, analysis_type: AnalysisType,
+                              custom_instructions: str = None) -> AsyncIterator[AIModelResponse]:
+        """Yield partial responses as chunks arrive from the provider.
+        
+        Each partial carries only the newly received chunk in ``response``;
+        confidence and token counts cover everything received so far, so
+        callers can act on early output without waiting for the full answer.
+        """
+        start_ns = time.monotonic_ns()
+        length = 0
+        words = 0
+        has_risk_keyword = False
+        is_uncertain = False
+        
+        async for chunk in self._stream_chunks(document_text, analysis_type, custom_instructions):
+            # Keyword signals are sticky, so only the new chunk needs scanning
+            lowered = chunk.lower()
+            length += len(chunk)
+            words += len(chunk.split())
+            has_risk_keyword = has_risk_keyword or any(keyword in lowered for keyword in RISK_KEYWORDS)
+            is_uncertain = is_uncertain or 'uncertain' in lowered or '?' in chunk
+            
+            confidence = self._score_confidence(length, has_risk_keyword, is_uncertain)
+            yield AIModelResponse(
+                model=self.model,
+                response=chunk,
+                confidence_score=min(max(confidence + self.confidence_adjustment, 0.0), 1.0),
+                processing_time=(time.monotonic_ns() - start_ns) / 1e9,
+                tokens_used=words
+            )
+            
+    async def _stream_chunks(self, document_text: str, analysis_type: AnalysisType,
+                             custom_instructions: str = None) -> AsyncIterator[str]:
+        """Yield response text chunks as the provider emits them"""
+        # Simulated server-sent events: replay the mock response line by line
+        response = await self._generate_mock_response(document_text, analysis_type, custom_instructions)
+        for line in response.splitlines(keepends=True):
+            await asyncio.sleep(0)
+            yield line
 
 class OpenAIProvider(AIProvider):
     """OpenAI GPT-4 provider"""
     
-    def __init__(self, api_key: str = None):
-        super().__init__("gpt-4", api_key)
-        
-    async def analyze_document(self, document_text: str, analysis_type: AnalysisType, 
-                             custom_instructions: str = None) -> AIModelResponse:
-        start_time = time.time()
-        
-        # Simulate API call to OpenAI
-        await asyncio.sleep(0.5)  # Simulate network delay
-        
-        # Generate mock response based on analysis type
-        response = await self._generate_mock_response(document_text, analysis_type, custom_instructions)
-        
-        processing_time = time.time() - start_time
-        confidence = await self.calculate_confidence(response, analysis_type)
-        
-        return AIModelResponse(
-            model=AIModel.GPT_4,
-            response=response,
-            confidence_score=confidence,
-            processing_time=processing_time,
-            tokens_used=len(document_text.split()) * 2  # Rough estimation
-        )
+    model = AIModel.GPT_4
     
-    async def _generate_mock_response(self, document_text: str, analysis_type: AnalysisType, 
-                                    custom_instructions: str = None) -> str:
-        """Generate mock response for demonstration"""
-        if analysis_type == AnalysisType.RISK_ASSESSMENT:
-            return """This contract contains moderate risk factors:
+    _DEFAULT_RESPONSE = "Analysis complete for {}. Review the document carefully for legal implications."
+    
+    # Canned demo responses, held encoded and decoded on demand
+    _MOCK_RESPONSES = {
+        AnalysisType.RISK_ASSESSMENT: """This contract contains moderate risk factors:
 1. Liability clause may expose organization to unlimited damages
 2. Termination clause favors the counterparty
 3. IP ownership terms need clarification
 4. Payment terms could cause cash flow issues
-Overall risk level: MEDIUM"""
-        
-        elif analysis_type == AnalysisType.CLAUSE_EXTRACTION:
-            return """Key clauses identified:
+Overall risk level: MEDIUM""".encode("utf-8"),
+        AnalysisType.CLAUSE_EXTRACTION: """Key clauses identified:
 1. Payment Terms: Net 30 days payment
 2. Liability: Limited to contract value
 3. Termination: 30-day notice required
 4. Intellectual Property: Work-for-hire arrangement
-5. Confidentiality: Standard mutual NDA terms"""
-        
-        elif analysis_type == AnalysisType.COMPLIANCE_CHECK:
-            return """Compliance Analysis:
+5. Confidentiality: Standard mutual NDA terms""".encode("utf-8"),
+        AnalysisType.COMPLIANCE_CHECK: """Compliance Analysis:
 ✓ GDPR compliance elements present
 ✓ Standard legal disclaimers included
 ⚠ Missing accessibility requirements
 ⚠ Data retention period not specified
-✗ Missing jurisdiction clause"""
-        
-        elif analysis_type == AnalysisType.SUMMARIZATION:
-            return """Document Summary:
-This is a service agreement between two parties establishing terms for software development services. Key points include project scope, payment schedule, intellectual property rights, and termination conditions. The contract duration is 12 months with renewal options."""
-        
-        else:
-            return f"Analysis complete for {analysis_type.value}. Review the document carefully for legal implications."
-
-class AnthropicProvider(AIProvider):
-    """Anthropic Claude provider"""
+✗ Missing jurisdiction clause""".encode("utf-8"),
+        AnalysisType.SUMMARIZATION: """Document Summary:
+This is a service agreement between two parties establishing terms for software development services. Key points include project scope, payment schedule, intellectual property rights, and termination conditions. The contract duration is 12 months with renewal options.""".encode("utf-8"),
+    }
     
     def __init__(self, api_key: str = None):
-        super().__init__("claude-3-opus", api_key)
+        super().__init__("gpt-4", api_key)
         
     async def analyze_document(self, document_text: str, analysis_type: AnalysisType, 
                              custom_instructions: str = None) -> AIModelResponse:
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
-        # Simulate API call to Anthropic
-        await asyncio.sleep(0.7)  # Simulate network delay
+        # Simulate API call to OpenAI
+        payload = self.encode_payload(
+            self.build_payload(document_text, analysis_type, custom_instructions)
+        )
+        await self._send_request(payload, 0.5)  # Simulate network delay
         
+        # Generate mock response based on analysis type
         response = await self._generate_mock_response(document_text, analysis_type, custom_instructions)
         
-        processing_time = time.time() - start_time
+        processing_time = (time.monotonic_ns() - start_ns) / 1e9
         confidence = await self.calculate_confidence(response, analysis_type)
         
         return AIModelResponse(
-            model=AIModel.CLAUDE_3_OPUS,
+            model=self.model,
             response=response,
-            confidence_score=confidence + 0.05,  # Claude tends to be more confident
+            confidence_score=confidence,
             processing_time=processing_time,
-            tokens_used=len(document_text.split()) * 1.8
+            tokens_used=len(document_text.split()) * 2  # Rough estimation
         )
+
+class AnthropicProvider(AIProvider):
+    """Anthropic Claude provider"""
     
-    async def _generate_mock_response(self, document_text: str, analysis_type: AnalysisType, 
-                                    custom_instructions: str = None) -> str:
-        """Generate mock response for demonstration"""
-        if analysis_type == AnalysisType.RISK_ASSESSMENT:
-            return """Risk Assessment (Claude Analysis):
+    model = AIModel.CLAUDE_3_OPUS
+    confidence_adjustment = 0.05  # Claude tends to be more confident
+    
+    _DEFAULT_RESPONSE = "Claude analysis for {}: Detailed review completed with focus on nuanced legal implications."
+    
+    # Canned demo responses, held encoded and decoded on demand
+    _MOCK_RESPONSES = {
+        AnalysisType.RISK_ASSESSMENT: """Risk Assessment (Claude Analysis):
 Primary concerns identified:
 • Force majeure clause is too restrictive
 • Indemnification terms heavily favor counterparty
 • Dispute resolution lacks arbitration option
 • Intellectual property assignment is overly broad
-Risk Level: MEDIUM-HIGH with specific remediation needed"""
-        
-        elif analysis_type == AnalysisType.NEGOTIATION_POINTS:
-            return """Negotiation Recommendations:
+Risk Level: MEDIUM-HIGH with specific remediation needed""".encode("utf-8"),
+        AnalysisType.NEGOTIATION_POINTS: """Negotiation Recommendations:
 1. Request mutual liability cap at 2x contract value
 2. Add reciprocal termination rights
 3. Negotiate IP ownership for improvements
 4. Include performance milestone protections
 5. Add force majeure carve-outs for pandemics
-Priority: Items 1 and 3 are most critical"""
-        
-        else:
-            return f"Claude analysis for {analysis_type.value}: Detailed review completed with focus on nuanced legal implications."
-
-class LlamaProvider(AIProvider):
-    """Meta Llama provider"""
+Priority: Items 1 and 3 are most critical""".encode("utf-8"),
+    }
     
     def __init__(self, api_key: str = None):
-        super().__init__("llama-2-70b", api_key)
+        super().__init__("claude-3-opus", api_key)
         
     async def analyze_document(self, document_text: str, analysis_type: AnalysisType, 
                              custom_instructions: str = None) -> AIModelResponse:
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
-        # Simulate API call to Llama
-        await asyncio.sleep(0.8)  # Simulate network delay
+        # Simulate API call to Anthropic
+        payload = self.encode_payload(
+            self.build_payload(document_text, analysis_type, custom_instructions)
+        )
+        await self._send_request(payload, 0.7)  # Simulate network delay
         
         response = await self._generate_mock_response(document_text, analysis_type, custom_instructions)
         
-        processing_time = time.time() - start_time
+        processing_time = (time.monotonic_ns() - start_ns) / 1e9
         confidence = await self.calculate_confidence(response, analysis_type)
         
         return AIModelResponse(
-            model=AIModel.LLAMA_2_70B,
+            model=self.model,
             response=response,
-            confidence_score=confidence - 0.02,  # Slightly more conservative
+            confidence_score=confidence + self.confidence_adjustment,
             processing_time=processing_time,
-            tokens_used=len(document_text.split()) * 2.2
+            tokens_used=len(document_text.split()) * 1.8
         )
+
+class LlamaProvider(AIProvider):
+    """Meta Llama provider"""
     
-    async def _generate_mock_response(self, document_text: str, analysis_type: AnalysisType, 
-                                    custom_instructions: str = None) -> str:
-        """Generate mock response for demonstration"""
-        if analysis_type == AnalysisType.COMPLIANCE_CHECK:
-            return """Llama Compliance Analysis:
+    model = AIModel.LLAMA_2_70B
+    confidence_adjustment = -0.02  # Slightly more conservative
+    
+    _DEFAULT_RESPONSE = "Llama model analysis for {}: Comprehensive review with focus on practical implementation."
+    
+    # Canned demo responses, held encoded and decoded on demand
+    _MOCK_RESPONSES = {
+        AnalysisType.COMPLIANCE_CHECK: """Llama Compliance Analysis:
 Regulatory Compliance Status:
 - Data Protection: Partially compliant (missing DPO contact)
 - Contract Law: Fully compliant with standard requirements
 - Industry Standards: Meets basic requirements
 - International Law: Requires jurisdiction specification
-Recommendation: Address data protection gaps before execution"""
+Recommendation: Address data protection gaps before execution""".encode("utf-8"),
+    }
+    
+    def __init__(self, api_key: str = None):
+        super().__init__("llama-2-70b", api_key)
+        
+    async def analyze_document(self, document_text: str, analysis_type: AnalysisType, 
+                             custom_instructions: str = None) -> AIModelResponse:
+        start_ns = time.monotonic_ns()
         
-        else:
-            return f"Llama model analysis for {analysis_type.value}: Comprehensive review with focus on practical implementation."
+        # Simulate API call to Llama
+        payload = self.encode_payload(
+            self.build_payload(document_text, analysis_type, custom_instructions)
+        )
+        await self._send_request(payload, 0.8)  # Simulate network delay
+        
+        response = await self._generate_mock_response(document_text, analysis_type, custom_instructions)
+        
+        processing_time = (time.monotonic_ns() - start_ns) / 1e9
+        confidence = await self.calculate_confidence(response, analysis_type)
+        
+        return AIModelResponse(
+            model=self.model,
+            response=response,
+            confidence_score=confidence + self.confidence_adjustment,
+            processing_time=processing_time,
+            tokens_used=len(document_text.split()) * 2.2
+        )
 
 class AIOrchestrator:
     """Orchestrates multiple AI models for document analysis"""
     
     def __init__(self):
-        self.providers = {
-            AIModel.GPT_4: OpenAIProvider(),
-            AIModel.CLAUDE_3_OPUS: AnthropicProvider(), 
-            AIModel.LLAMA_2_70B: LlamaProvider()
+        # Providers are built on first use so unused ones never hold clients
+        self._factories = {
+            AIModel.GPT_4: OpenAIProvider,
+            AIModel.CLAUDE_3_OPUS: AnthropicProvider, 
+            AIModel.LLAMA_2_70B: LlamaProvider
         }
+        self._providers: Dict[AIModel, AIProvider] = {}
         self.fallback_order = [AIModel.GPT_4, AIModel.CLAUDE_3_OPUS, AIModel.LLAMA_2_70B]
         
     async def initialize(self):
@@ -217,6 +337,23 @@ class AIOrchestrator:
         """Cleanup resources"""
         logger.info("AI Orchestrator cleanup complete")
         
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _fetch_document(document_id: str) -> str:
+        """Retrieve document text, cached so repeat analyses skip retrieval"""
+        # For demo purposes, simulate document retrieval
+        return _DEMO_TEMPLATE.format(document_id)
+        
+    def _get_provider(self, model: AIModel) -> Optional[AIProvider]:
+        """Return the provider for a model, creating it on first request"""
+        provider = self._providers.get(model)
+        if provider is None:
+            factory = self._factories.get(model)
+            if factory is None:
+                return None
+            provider = self._providers[model] = factory()
+        return provider
+        
     async def analyze_document(self, document_id: str, analysis_type: AnalysisType,
                              models: List[AIModel] = None, 
                              custom_instructions: str = None) -> DocumentAnalysisResponse:
@@ -224,16 +361,16 @@ class AIOrchestrator:
         if models is None:
             models = [AIModel.GPT_4, AIModel.CLAUDE_3_OPUS]
             
-        # For demo purposes, simulate document retrieval
-        document_text = f"[Document {document_id}] Sample legal contract content for analysis..."
+        document_text = self._fetch_document(document_id)
         
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
         # Run analysis with all requested models in parallel
         tasks = []
         for model in models:
-            if model in self.providers:
-                task = self.providers[model].analyze_document(
+            provider = self._get_provider(model)
+            if provider is not None:
+                task = provider.analyze_document(
                     document_text, analysis_type, custom_instructions
                 )
                 tasks.append(task)
@@ -252,34 +389,107 @@ class AIOrchestrator:
             if not valid_responses:
                 raise Exception("All AI models failed to analyze the document")
             
-            # Generate consensus result
-            consensus_result = await self._generate_consensus(valid_responses, analysis_type)
-            overall_confidence = sum(r.confidence_score for r in valid_responses) / len(valid_responses)
+            return await self._combine_responses(
+                document_id, analysis_type, valid_responses,
+                start_ns, datetime.now(timezone.utc)
+            )
+            
+        except Exception as e:
+            logger.error(f"Document analysis failed: {e}")
+            raise
+    
+    async def analyze_documents(self, document_ids: List[str], analysis_type: AnalysisType,
+                              models: List[AIModel] = None,
+                              custom_instructions: str = None) -> List[DocumentAnalysisResponse]:
+        """Analyze several documents with one batched call per AI model"""
+        if models is None:
+            models = [AIModel.GPT_4, AIModel.CLAUDE_3_OPUS]
+            
+        document_texts = [self._fetch_document(document_id) for document_id in document_ids]
+        
+        start_ns = time.monotonic_ns()
+        
+        tasks = []
+        for model in models:
+            provider = self._get_provider(model)
+            if provider is not None:
+                tasks.append(provider.analyze_batch(
+                    document_texts, analysis_type, custom_instructions
+                ))
+        
+        try:
+            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
             
-            # Extract risk indicators and recommendations
-            risk_indicators = self._extract_risk_indicators(valid_responses)
-            recommendations = self._extract_recommendations(valid_responses)
-            key_clauses = self._extract_key_clauses(valid_responses)
+            valid_batches = []
+            for batch in batch_results:
+                if not isinstance(batch, Exception):
+                    valid_batches.append(batch)
+                else:
+                    logger.error(f"Model batch analysis failed: {batch}")
             
-            processing_time = time.time() - start_time
+            if not valid_batches:
+                raise Exception("All AI models failed to analyze the documents")
             
-            return DocumentAnalysisResponse(
-                document_id=document_id,
-                analysis_type=analysis_type,
-                model_responses=valid_responses,
-                consensus_result=consensus_result,
-                overall_confidence=overall_confidence,
-                risk_indicators=risk_indicators,
-                key_clauses=key_clauses,
-                recommendations=recommendations,
-                processing_time=processing_time,
-                timestamp=datetime.utcnow()
-            )
+            timestamp = datetime.now(timezone.utc)
+            results = []
+            for index, document_id in enumerate(document_ids):
+                valid_responses = [batch[index] for batch in valid_batches]
+                results.append(await self._combine_responses(
+                    document_id, analysis_type, valid_responses, start_ns, timestamp
+                ))
+            return results
             
         except Exception as e:
-            logger.error(f"Document analysis failed: {e}")
+            logger.error(f"Batch document analysis failed: {e}")
             raise
     
+    async def _combine_responses(self, document_id: str, analysis_type: AnalysisType,
+                               valid_responses: List[AIModelResponse], start_ns: int,
+                               timestamp: datetime) -> DocumentAnalysisResponse:
+        """Merge per-model responses for one document into a single result"""
+        # Resolve model names once for the consensus and extraction passes
+        model_names = [r.model.value for r in valid_responses]
+        
+        # Generate consensus result
+        consensus_result = await self._generate_consensus(valid_responses, analysis_type, model_names)
+        overall_confidence = sum(r.confidence_score for r in valid_responses) / len(valid_responses)
+        
+        # Extract risk indicators and recommendations
+        lowered = [r.response.lower() for r in valid_responses]
+        risk_indicators = self._extract_risk_indicators(model_names, lowered)
+        recommendations = self._extract_recommendations(lowered)
+        key_clauses = self._extract_key_clauses(valid_responses, model_names, lowered)
+        
+        processing_time = (time.monotonic_ns() - start_ns) / 1e9
+        
+        return DocumentAnalysisResponse(
+            document_id=document_id,
+            analysis_type=analysis_type,
+            model_responses=valid_responses,
+            consensus_result=consensus_result,
+            overall_confidence=overall_confidence,
+            risk_indicators=risk_indicators,
+            key_clauses=key_clauses,
+            recommendations=recommendations,
+            processing_time=processing_time,
+            timestamp=timestamp
+        )
+    
+    async def stream_document(self, document_id: str, analysis_type: AnalysisType,
+                            model: AIModel = AIModel.GPT_4,
+                            custom_instructions: str = None) -> AsyncIterator[AIModelResponse]:
+        """Stream partial analysis results from a single AI model"""
+        provider = self._get_provider(model)
+        if provider is None:
+            raise ValueError(f"Unsupported model: {model.value}")
+            
+        document_text = self._fetch_document(document_id)
+        
+        async for partial in provider.stream_document(
+            document_text, analysis_type, custom_instructions
+        ):
+            yield partial
+    
     async def calculate_risk_score(self, document_id: str) -> ContractRiskScore:
         """Calculate comprehensive risk score for contract"""
         # Simulate risk calculation
@@ -323,11 +533,12 @@ class AIOrchestrator:
                 "Negotiate reciprocal termination rights",
                 "Include force majeure protections"
             ],
-            assessed_at=datetime.utcnow()
+            assessed_at=datetime.now(timezone.utc)
         )
     
     async def _generate_consensus(self, responses: List[AIModelResponse], 
-                                analysis_type: AnalysisType) -> str:
+                                analysis_type: AnalysisType,
+                                model_names: List[str]) -> str:
         """Generate consensus result from multiple model responses"""
         # Simple consensus algorithm - in production, this would be more sophisticated
         if not responses:
@@ -339,8 +550,8 @@ class AIOrchestrator:
         # For demo, combine insights from multiple models
         consensus = f"Multi-model analysis consensus for {analysis_type.value}:\n\n"
         
-        for i, response in enumerate(responses):
-            consensus += f"Model {response.model.value} (confidence: {response.confidence_score:.2f}):\n"
+        for name, response in zip(model_names, responses):
+            consensus += f"Model {name} (confidence: {response.confidence_score:.2f}):\n"
             consensus += f"{response.response}\n\n"
         
         consensus += "Consensus: Multiple AI models agree on key risk factors and recommendations. "
@@ -348,47 +559,48 @@ class AIOrchestrator:
         
         return consensus
     
-    def _extract_risk_indicators(self, responses: List[AIModelResponse]) -> List[str]:
+    def _extract_risk_indicators(self, model_names: List[str],
+                                 lowered: List[str]) -> List[str]:
         """Extract risk indicators from model responses"""
-        indicators = []
-        for response in responses:
-            text = response.response.lower()
+        # dict keys give O(1) dedupe while keeping first-seen order
+        indicators: Dict[str, None] = {}
+        for name, text in zip(model_names, lowered):
             if 'risk' in text or 'concern' in text:
-                indicators.append(f"Risk identified by {response.model.value}")
+                indicators[f"Risk identified by {name}"] = None
             if 'liability' in text:
-                indicators.append("Liability concerns noted")
+                indicators["Liability concerns noted"] = None
             if 'termination' in text:
-                indicators.append("Termination clause issues")
+                indicators["Termination clause issues"] = None
             if 'payment' in text:
-                indicators.append("Payment terms require review")
+                indicators["Payment terms require review"] = None
         
-        return list(set(indicators))  # Remove duplicates
+        return list(indicators)
     
-    def _extract_recommendations(self, responses: List[AIModelResponse]) -> List[str]:
-        """Extract recommendations from model responses"""
-        recommendations = []
-        for response in responses:
-            text = response.response
-            if 'negotiate' in text.lower():
-                recommendations.append("Negotiation recommended for key terms")
-            if 'add' in text.lower() and 'clause' in text.lower():
-                recommendations.append("Consider adding protective clauses")
-            if 'review' in text.lower():
-                recommendations.append("Detailed legal review recommended")
-        
-        return list(set(recommendations))
+    def _extract_recommendations(self, lowered: List[str]) -> List[str]:
+        """Extract recommendations from lowercased model responses"""
+        recommendations: Dict[str, None] = {}
+        for text in lowered:
+            if 'negotiate' in text:
+                recommendations["Negotiation recommended for key terms"] = None
+            if 'add' in text and 'clause' in text:
+                recommendations["Consider adding protective clauses"] = None
+            if 'review' in text:
+                recommendations["Detailed legal review recommended"] = None
+        
+        return list(recommendations)
     
-    def _extract_key_clauses(self, responses: List[AIModelResponse]) -> List[Dict[str, Any]]:
+    def _extract_key_clauses(self, responses: List[AIModelResponse], model_names: List[str],
+                             lowered: List[str]) -> List[Dict[str, Any]]:
         """Extract key clauses mentioned in responses"""
         clauses = []
         common_clauses = ["payment", "liability", "termination", "intellectual property", "confidentiality"]
         
         for clause_type in common_clauses:
-            for response in responses:
-                if clause_type in response.response.lower():
+            for response, name, text in zip(responses, model_names, lowered):
+                if clause_type in text:
                     clauses.append({
                         "type": clause_type,
-                        "identified_by": response.model.value,
+                        "identified_by": name,
                         "confidence": response.confidence_score
                     })
                     break
@@ -4,55 +4,244 @@ Handles WebSocket connections, live editing, comments, and user presence
 """
 
 import asyncio
-import json
+import sys
 import time
-from typing import Dict, Any, List, Set
-from datetime import datetime
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+from datetime import datetime, timezone
 import logging
+import msgspec
+import numpy as np
 from fastapi import WebSocket, WebSocketDisconnect
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from app.models.schemas import CollaborationEvent, CommentModel, AnnotationModel
 
 logger = logging.getLogger(__name__)
 
+# Comments/annotations kept per document session and replayed to joining users
+MAX_SESSION_HISTORY = 500
+
+# Collaboration events are queued on the hot path and written in batches
+EVENT_QUEUE_SIZE = 10000
+EVENT_BATCH_SIZE = 256
+
+# Cursor updates are coalesced per user and flushed at most 30 times a second
+CURSOR_FLUSH_INTERVAL = 1 / 30
+
+# Conflict batches at least this large use the compiled transform kernel (when numba is installed)
+JIT_CONFLICT_THRESHOLD = 1000
+
+class ClientMessage(msgspec.Struct):
+    """Incoming collaboration message, decoded without an intermediate dict"""
+    type: str = ''
+    change: Any = {}  # passed through to other collaborators as sent
+    comment: Dict[str, Any] = {}
+    annotation: Dict[str, Any] = {}
+    position: Any = {}  # passed through to other collaborators as sent
+    section: str = 'document'
+
+# MessagePack codec shared by every connection (binary WebSocket frames)
+MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+MSGPACK_DECODER = msgspec.msgpack.Decoder(ClientMessage)
+
+# JSON fallback for clients that negotiate the 'json' subprotocol (text frames)
+JSON_SUBPROTOCOL = 'json'
+JSON_ENCODER = msgspec.json.Encoder()
+JSON_DECODER = msgspec.json.Decoder(ClientMessage)
+
+class EncodedMessage:
+    """Outgoing message encoded lazily, at most once per wire format"""
+    __slots__ = ('message', '_binary', '_text')
+    
+    def __init__(self, message: Union[Dict[str, Any], msgspec.Struct]):
+        self.message = message
+        self._binary = None
+        self._text = None
+    
+    # The ASGI send message itself is built once and shared by every recipient
+    def binary_frame(self) -> Dict[str, Any]:
+        """ASGI send message carrying the MessagePack frame"""
+        if self._binary is None:
+            self._binary = {'type': 'websocket.send', 'bytes': MSGPACK_ENCODER.encode(self.message)}
+        return self._binary
+    
+    def text_frame(self) -> Dict[str, Any]:
+        """ASGI send message carrying the JSON frame"""
+        if self._text is None:
+            self._text = {'type': 'websocket.send', 'text': JSON_ENCODER.encode(self.message).decode()}
+        return self._text
+
+class TextChangeEvent(msgspec.Struct, frozen=True, tag_field='type', tag='text_change'):
+    """Text change broadcast to other collaborators"""
+    user_id: str
+    change: Any
+    version: int
+    timestamp: float
+
+class CursorPositionEvent(msgspec.Struct, frozen=True, tag_field='type', tag='cursor_position'):
+    """Cursor position broadcast to other collaborators"""
+    user_id: str
+    position: Any
+    timestamp: float
+
+class NewCommentEvent(msgspec.Struct, frozen=True, tag_field='type', tag='new_comment'):
+    """Comment broadcast to the document session"""
+    comment: Dict[str, Any]
+    timestamp: float
+
+class NewAnnotationEvent(msgspec.Struct, frozen=True, tag_field='type', tag='new_annotation'):
+    """Annotation broadcast to the document session"""
+    annotation: Dict[str, Any]
+    timestamp: float
+
+class UserJoinedEvent(msgspec.Struct, frozen=True, tag_field='type', tag='user_joined'):
+    """User joined broadcast to other collaborators"""
+    user_id: str
+    timestamp: float
+
+def _change_timestamp(change: Dict[str, Any]) -> float:
+    """Epoch seconds of a change, accepting numbers and ISO-8601 strings (missing or unreadable -> 0.0)"""
+    timestamp = change.get('timestamp')
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        try:
+            return float(timestamp)
+        except ValueError:
+            pass
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except ValueError:
+            return 0.0
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return 0.0
+
+def _transform_positions(positions: List[int], deltas: List[int]) -> List[int]:
+    """Shift each position by the earlier changes at or before it (simplified OT)"""
+    transformed = []
+    for position in positions:
+        # zip stops at len(transformed), i.e. only the earlier changes
+        for prev_position, delta in zip(transformed, deltas):
+            if prev_position <= position:
+                position += delta
+        transformed.append(max(0, position))
+    return transformed
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _transform_positions_jit(positions: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        """Compiled _transform_positions for large conflict batches"""
+        transformed = np.empty_like(positions)
+        for k in range(positions.shape[0]):
+            position = positions[k]
+            for j in range(k):
+                if transformed[j] <= position:
+                    position += deltas[j]
+            transformed[k] = max(0, position)
+        return transformed
+
+class DocumentSession:
+    """Live collaboration state for one document"""
+    __slots__ = ('users', 'comments', 'annotations', 'version', 'last_edit')
+    
+    def __init__(self):
+        self.users: Set[str] = set()
+        self.comments: deque = deque(maxlen=MAX_SESSION_HISTORY)
+        self.annotations: deque = deque(maxlen=MAX_SESSION_HISTORY)
+        self.version = 1
+        self.last_edit: Optional[Dict[str, Any]] = None
+
+class UserPresence:
+    """Presence of one collaborator"""
+    __slots__ = ('document_id', 'last_activity', 'status')
+    
+    def __init__(self, document_id: str, last_activity: float, status: str = 'active'):
+        self.document_id = document_id
+        self.last_activity = last_activity
+        self.status = status
+
 class CollaborationManager:
     """Manages real-time collaboration features"""
     
     def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        self.document_sessions: Dict[str, Dict[str, Any]] = {}
-        self.user_presence: Dict[str, Dict[str, Any]] = {}
-        self.document_locks: Dict[str, str] = {}  # document_id -> user_id
+        self.active_connections: Dict[str, Dict[str, WebSocket]] = {}  # document_id -> user_id -> websocket
+        self.document_sessions: Dict[str, DocumentSession] = {}
+        self.user_presence: Dict[str, UserPresence] = {}
+        self.document_locks: Dict[Tuple[str, str], str] = {}  # (document_id, section) -> user_id
+        self._user_locks: Dict[str, Set[Tuple[str, str]]] = {}  # user_id -> lock keys held
+        self._json_connections: Set[WebSocket] = set()  # sockets using the JSON text fallback
+        self._history_cache: Dict[str, Dict[bool, Tuple[msgspec.Raw, msgspec.Raw]]] = {}  # encoded comments/annotations
+        self._collaborator_cache: Dict[str, List[Dict[str, Any]]] = {}  # document_id -> collaborators listing
+        self._event_queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._event_task: Optional[asyncio.Task] = None
+        self._events_dropped = 0
+        self._pending_cursors: Dict[str, Dict[str, CursorPositionEvent]] = {}  # document_id -> user_id -> latest
+        self._cursor_flushes: Dict[str, asyncio.Task] = {}
+        
+    async def initialize(self):
+        """Start the background collaboration event writer"""
+        if self._event_task is None:
+            self._event_task = asyncio.create_task(self._drain_events())
+        logger.info("Collaboration manager initialized")
         
+    async def cleanup(self):
+        """Stop the event writer and flush queued events"""
+        for flush in list(self._cursor_flushes.values()):
+            flush.cancel()
+        self._pending_cursors.clear()
+        
+        if self._event_task is not None:
+            self._event_task.cancel()
+            try:
+                await self._event_task
+            except asyncio.CancelledError:
+                pass
+            self._event_task = None
+        
+        remaining = []
+        while not self._event_queue.empty():
+            remaining.append(self._event_queue.get_nowait())
+        if remaining:
+            self._write_events(remaining)
+        logger.info("Collaboration manager cleanup complete")
+    
     async def handle_connection(self, websocket: WebSocket, document_id: str, user_id: str):
         """Handle new WebSocket connection for collaboration"""
+        # Every event and state entry for this connection shares one copy of each id
+        document_id = sys.intern(document_id)
+        user_id = sys.intern(user_id)
+        
         try:
-            await websocket.accept()
+            # Clients offering only the 'json' subprotocol get JSON text frames, everyone else msgpack
+            subprotocols = websocket.scope.get('subprotocols') or []
+            json_wire = JSON_SUBPROTOCOL in subprotocols and 'msgpack' not in subprotocols
+            if json_wire:
+                self._json_connections.add(websocket)
+                await websocket.accept(subprotocol=JSON_SUBPROTOCOL)
+            else:
+                await websocket.accept(subprotocol='msgpack' if 'msgpack' in subprotocols else None)
             
             # Add to active connections
-            if document_id not in self.active_connections:
-                self.active_connections[document_id] = []
-            self.active_connections[document_id].append(websocket)
+            self.active_connections.setdefault(document_id, {})[user_id] = websocket
             
             # Initialize document session if needed
             if document_id not in self.document_sessions:
-                self.document_sessions[document_id] = {
-                    'users': set(),
-                    'comments': [],
-                    'annotations': [],
-                    'version': 1,
-                    'last_edit': None
-                }
+                self.document_sessions[document_id] = DocumentSession()
             
             # Add user to session
-            self.document_sessions[document_id]['users'].add(user_id)
+            self.document_sessions[document_id].users.add(user_id)
             
             # Update user presence
-            self.user_presence[user_id] = {
-                'document_id': document_id,
-                'last_activity': datetime.utcnow(),
-                'status': 'active'
-            }
+            self.user_presence[user_id] = UserPresence(document_id, time.time())
+            self._collaborator_cache.pop(document_id, None)
             
             # Notify other users of new connection
             await self._broadcast_user_joined(document_id, user_id)
@@ -63,27 +252,29 @@ class CollaborationManager:
             # Listen for messages
             while True:
                 try:
-                    data = await websocket.receive_text()
-                    message = json.loads(data)
+                    if json_wire:
+                        message = JSON_DECODER.decode(await websocket.receive_text())
+                    else:
+                        message = MSGPACK_DECODER.decode(await websocket.receive_bytes())
                     await self._handle_collaboration_message(websocket, document_id, user_id, message)
                 except WebSocketDisconnect:
                     break
                 except Exception as e:
-                    logger.error(f"Error handling collaboration message: {e}")
-                    await websocket.send_text(json.dumps({
+                    logger.error("Error handling collaboration message: %s", e)
+                    await self._send(websocket, EncodedMessage({
                         'type': 'error',
                         'message': str(e)
                     }))
                     
         except Exception as e:
-            logger.error(f"Collaboration connection error: {e}")
+            logger.error("Collaboration connection error: %s", e)
         finally:
             await self._handle_disconnect(websocket, document_id, user_id)
     
     async def _handle_collaboration_message(self, websocket: WebSocket, document_id: str, 
-                                          user_id: str, message: Dict[str, Any]):
+                                          user_id: str, message: ClientMessage):
         """Handle incoming collaboration message"""
-        message_type = message.get('type')
+        message_type = message.type
         
         if message_type == 'text_change':
             await self._handle_text_change(document_id, user_id, message)
@@ -100,71 +291,74 @@ class CollaborationManager:
         elif message_type == 'heartbeat':
             await self._handle_heartbeat(user_id)
         else:
-            logger.warning(f"Unknown message type: {message_type}")
+            logger.warning("Unknown message type: %s", message_type)
     
-    async def _handle_text_change(self, document_id: str, user_id: str, message: Dict[str, Any]):
+    async def _handle_text_change(self, document_id: str, user_id: str, message: ClientMessage):
         """Handle real-time text changes"""
         try:
-            # Update document version
-            if document_id in self.document_sessions:
-                self.document_sessions[document_id]['version'] += 1
-                self.document_sessions[document_id]['last_edit'] = {
-                    'user_id': user_id,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'change': message.get('change', {})
-                }
+            ts = time.time()
+            change = message.change
             
-            # Broadcast change to other users
-            change_event = {
-                'type': 'text_change',
+            # Update document version
+            session = self.document_sessions[document_id]
+            session.version += 1
+            session.last_edit = {
                 'user_id': user_id,
-                'change': message.get('change', {}),
-                'version': self.document_sessions[document_id]['version'],
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': ts,
+                'change': change
             }
             
+            # Broadcast change to other users
+            change_event = TextChangeEvent(
+                user_id=user_id,
+                change=change,
+                version=session.version,
+                timestamp=ts
+            )
+            
             await self._broadcast_to_document(document_id, change_event, exclude_user=user_id)
             
             # Log collaboration event
-            await self._log_collaboration_event(
+            self._log_collaboration_event(
                 event_type="text_change",
                 user_id=user_id,
                 document_id=document_id,
-                data=message.get('change', {})
+                data=change
             )
             
         except Exception as e:
-            logger.error(f"Error handling text change: {e}")
+            logger.error("Error handling text change: %s", e)
     
-    async def _handle_comment(self, document_id: str, user_id: str, message: Dict[str, Any]):
+    async def _handle_comment(self, document_id: str, user_id: str, message: ClientMessage):
         """Handle comment addition"""
         try:
-            comment_data = message.get('comment', {})
+            ts = time.time()
+            comment_data = message.comment
             
             comment = {
-                'id': f"comment_{int(time.time())}_{user_id}",
+                'id': f"comment_{int(ts)}_{user_id}",
                 'user_id': user_id,
                 'text': comment_data.get('text', ''),
                 'position': comment_data.get('position', {}),
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': ts,
                 'resolved': False
             }
             
             # Add to document session
             if document_id in self.document_sessions:
-                self.document_sessions[document_id]['comments'].append(comment)
+                self.document_sessions[document_id].comments.append(comment)
+                self._history_cache.pop(document_id, None)
             
             # Broadcast comment to other users
-            comment_event = {
-                'type': 'new_comment',
-                'comment': comment,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            comment_event = NewCommentEvent(
+                comment=comment,
+                timestamp=comment['timestamp']
+            )
             
             await self._broadcast_to_document(document_id, comment_event)
             
             # Log collaboration event
-            await self._log_collaboration_event(
+            self._log_collaboration_event(
                 event_type="comment_added",
                 user_id=user_id,
                 document_id=document_id,
@@ -172,132 +366,155 @@ class CollaborationManager:
             )
             
         except Exception as e:
-            logger.error(f"Error handling comment: {e}")
+            logger.error("Error handling comment: %s", e)
     
-    async def _handle_annotation(self, document_id: str, user_id: str, message: Dict[str, Any]):
+    async def _handle_annotation(self, document_id: str, user_id: str, message: ClientMessage):
         """Handle annotation addition"""
         try:
-            annotation_data = message.get('annotation', {})
+            ts = time.time()
+            annotation_data = message.annotation
             
             annotation = {
-                'id': f"annotation_{int(time.time())}_{user_id}",
+                'id': f"annotation_{int(ts)}_{user_id}",
                 'user_id': user_id,
                 'type': annotation_data.get('type', 'highlight'),
                 'content': annotation_data.get('content', ''),
                 'position': annotation_data.get('position', {}),
                 'style': annotation_data.get('style', {}),
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': ts
             }
             
             # Add to document session
             if document_id in self.document_sessions:
-                self.document_sessions[document_id]['annotations'].append(annotation)
+                self.document_sessions[document_id].annotations.append(annotation)
+                self._history_cache.pop(document_id, None)
             
             # Broadcast annotation to other users
-            annotation_event = {
-                'type': 'new_annotation',
-                'annotation': annotation,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            annotation_event = NewAnnotationEvent(
+                annotation=annotation,
+                timestamp=annotation['timestamp']
+            )
             
             await self._broadcast_to_document(document_id, annotation_event)
             
         except Exception as e:
-            logger.error(f"Error handling annotation: {e}")
+            logger.error("Error handling annotation: %s", e)
     
-    async def _handle_cursor_position(self, document_id: str, user_id: str, message: Dict[str, Any]):
+    async def _handle_cursor_position(self, document_id: str, user_id: str, message: ClientMessage):
         """Handle cursor position updates"""
         try:
-            cursor_event = {
-                'type': 'cursor_position',
-                'user_id': user_id,
-                'position': message.get('position', {}),
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            cursor_event = CursorPositionEvent(
+                user_id=user_id,
+                position=message.position,
+                timestamp=time.time()
+            )
             
-            await self._broadcast_to_document(document_id, cursor_event, exclude_user=user_id)
+            # Keep only the latest position per user until the next flush
+            self._pending_cursors.setdefault(document_id, {})[user_id] = cursor_event
+            if document_id not in self._cursor_flushes:
+                self._cursor_flushes[document_id] = asyncio.create_task(
+                    self._flush_cursor_positions(document_id)
+                )
             
         except Exception as e:
-            logger.error(f"Error handling cursor position: {e}")
+            logger.error("Error handling cursor position: %s", e)
     
-    async def _handle_lock_request(self, document_id: str, user_id: str, message: Dict[str, Any]):
+    async def _flush_cursor_positions(self, document_id: str):
+        """Broadcast the latest pending cursor position of each user"""
+        try:
+            await asyncio.sleep(CURSOR_FLUSH_INTERVAL)
+        finally:
+            self._cursor_flushes.pop(document_id, None)
+        
+        pending = self._pending_cursors.pop(document_id, {})
+        for user_id, cursor_event in pending.items():
+            await self._broadcast_to_document(document_id, cursor_event, exclude_user=user_id)
+    
+    async def _handle_lock_request(self, document_id: str, user_id: str, message: ClientMessage):
         """Handle document section lock request"""
         try:
-            section = message.get('section', 'document')
-            lock_key = f"{document_id}_{section}"
+            ts = time.time()
+            section = message.section
+            lock_key = (document_id, section)
             
             # Check if section is already locked
-            if lock_key in self.document_locks:
+            granted = lock_key not in self.document_locks
+            if not granted:
                 # Deny lock request
                 lock_response = {
                     'type': 'lock_denied',
                     'section': section,
                     'locked_by': self.document_locks[lock_key],
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': ts
                 }
             else:
                 # Grant lock
                 self.document_locks[lock_key] = user_id
+                self._user_locks.setdefault(user_id, set()).add(lock_key)
                 lock_response = {
                     'type': 'lock_granted',
                     'section': section,
                     'user_id': user_id,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': ts
                 }
-                
+            
+            encoded = EncodedMessage(lock_response)
+            if granted:
                 # Notify other users about the lock
-                await self._broadcast_to_document(document_id, lock_response, exclude_user=user_id)
+                await self._broadcast_encoded(document_id, encoded, exclude_user=user_id)
             
             # Send response to requesting user
-            connections = self.active_connections.get(document_id, [])
-            user_websocket = None
-            # In production, you'd maintain user-websocket mapping
-            for websocket in connections:
-                await websocket.send_text(json.dumps(lock_response))
-                break
+            user_websocket = self.active_connections.get(document_id, {}).get(user_id)
+            if user_websocket is not None:
+                await self._send(user_websocket, encoded)
             
         except Exception as e:
-            logger.error(f"Error handling lock request: {e}")
+            logger.error("Error handling lock request: %s", e)
     
     async def _handle_lock_release(self, document_id: str, user_id: str):
         """Handle lock release"""
         try:
-            # Find and release locks held by this user
-            locks_to_release = []
-            for lock_key, lock_user in self.document_locks.items():
-                if lock_user == user_id and lock_key.startswith(document_id):
-                    locks_to_release.append(lock_key)
+            # Find and release locks held by this user in this document
+            held_locks = self._user_locks.get(user_id)
+            if not held_locks:
+                return
+            ts = time.time()
+            locks_to_release = [lock_key for lock_key in held_locks if lock_key[0] == document_id]
             
             for lock_key in locks_to_release:
                 del self.document_locks[lock_key]
-                section = lock_key.split(f"{document_id}_")[1]
+                held_locks.discard(lock_key)
+                if not held_locks:
+                    del self._user_locks[user_id]
+                section = lock_key[1]
                 
                 # Notify other users about lock release
                 lock_release_event = {
                     'type': 'lock_released',
                     'section': section,
                     'user_id': user_id,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': ts
                 }
                 
                 await self._broadcast_to_document(document_id, lock_release_event)
             
         except Exception as e:
-            logger.error(f"Error handling lock release: {e}")
+            logger.error("Error handling lock release: %s", e)
     
     async def _handle_heartbeat(self, user_id: str):
         """Handle user heartbeat to maintain presence"""
-        if user_id in self.user_presence:
-            self.user_presence[user_id]['last_activity'] = datetime.utcnow()
-            self.user_presence[user_id]['status'] = 'active'
+        presence = self.user_presence.get(user_id)
+        if presence is not None:
+            presence.last_activity = time.time()
+            presence.status = 'active'
+            self._collaborator_cache.pop(presence.document_id, None)
     
     async def _broadcast_user_joined(self, document_id: str, user_id: str):
         """Broadcast user joined event"""
-        join_event = {
-            'type': 'user_joined',
-            'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        join_event = UserJoinedEvent(
+            user_id=user_id,
+            timestamp=time.time()
+        )
         
         await self._broadcast_to_document(document_id, join_event, exclude_user=user_id)
     
@@ -307,50 +524,91 @@ class CollaborationManager:
             if document_id in self.document_sessions:
                 session = self.document_sessions[document_id]
                 
+                # History is encoded once per wire format and reused until the next comment/annotation
+                json_wire = websocket in self._json_connections
+                encoder = JSON_ENCODER if json_wire else MSGPACK_ENCODER
+                cached = self._history_cache.setdefault(document_id, {})
+                history = cached.get(json_wire)
+                if history is None:
+                    history = (
+                        msgspec.Raw(encoder.encode(list(session.comments))),
+                        msgspec.Raw(encoder.encode(list(session.annotations)))
+                    )
+                    cached[json_wire] = history
+                
                 state = {
                     'type': 'document_state',
-                    'version': session.get('version', 1),
-                    'comments': session.get('comments', []),
-                    'annotations': session.get('annotations', []),
-                    'active_users': list(session.get('users', set())),
-                    'timestamp': datetime.utcnow().isoformat()
+                    'version': session.version,
+                    'comments': history[0],
+                    'annotations': history[1],
+                    'active_users': list(session.users),
+                    'timestamp': time.time()
                 }
                 
-                await websocket.send_text(json.dumps(state))
+                await self._send(websocket, EncodedMessage(state))
             
         except Exception as e:
-            logger.error(f"Error sending document state: {e}")
+            logger.error("Error sending document state: %s", e)
     
-    async def _broadcast_to_document(self, document_id: str, message: Dict[str, Any], 
+    async def _broadcast_to_document(self, document_id: str, message: Union[Dict[str, Any], msgspec.Struct], 
                                    exclude_user: str = None):
         """Broadcast message to all users in document session"""
+        try:
+            connections = self.active_connections.get(document_id)
+            # Nothing to encode when nobody (other than the sender) is listening
+            if not connections or (len(connections) == 1 and exclude_user in connections):
+                return
+            
+            await self._broadcast_encoded(document_id, EncodedMessage(message), exclude_user)
+            
+        except Exception as e:
+            logger.error("Error broadcasting to document: %s", e)
+    
+    async def _send(self, websocket: WebSocket, encoded: EncodedMessage):
+        """Send message to one websocket in its negotiated wire format"""
+        if websocket in self._json_connections:
+            await websocket.send(encoded.text_frame())
+        else:
+            await websocket.send(encoded.binary_frame())
+    
+    async def _broadcast_encoded(self, document_id: str, encoded: EncodedMessage, exclude_user: str = None):
+        """Send an encoded message to all users in document session"""
         try:
             if document_id in self.active_connections:
-                message_str = json.dumps(message)
+                connections = self.active_connections[document_id]
                 
-                # Send to all connected websockets for this document
-                disconnected_websockets = []
-                for websocket in self.active_connections[document_id]:
-                    try:
-                        await websocket.send_text(message_str)
-                    except Exception as e:
-                        logger.warning(f"Failed to send message to websocket: {e}")
-                        disconnected_websockets.append(websocket)
+                recipients = [
+                    (connected_user, websocket) for connected_user, websocket in connections.items()
+                    if connected_user != exclude_user
+                ]
+                
+                # Send to all connected websockets for this document concurrently
+                results = await asyncio.gather(
+                    *(self._send(websocket, encoded) for _, websocket in recipients),
+                    return_exceptions=True
+                )
                 
                 # Remove disconnected websockets
-                for websocket in disconnected_websockets:
-                    self.active_connections[document_id].remove(websocket)
+                for (connected_user, websocket), result in zip(recipients, results):
+                    if isinstance(result, Exception):
+                        if logger.isEnabledFor(logging.WARNING):
+                            logger.warning("Failed to send message to websocket: %s", result)
+                        if connections.get(connected_user) is websocket:
+                            del connections[connected_user]
             
         except Exception as e:
-            logger.error(f"Error broadcasting to document: {e}")
+            logger.error("Error broadcasting to document: %s", e)
     
     async def _handle_disconnect(self, websocket: WebSocket, document_id: str, user_id: str):
         """Handle user disconnect"""
         try:
+            self._json_connections.discard(websocket)
+            
             # Remove from active connections
             if document_id in self.active_connections:
-                if websocket in self.active_connections[document_id]:
-                    self.active_connections[document_id].remove(websocket)
+                # Only drop the mapping if it still points at this socket
+                if self.active_connections[document_id].get(user_id) is websocket:
+                    del self.active_connections[document_id][user_id]
                 
                 # Remove document session if no more connections
                 if not self.active_connections[document_id]:
@@ -358,61 +616,94 @@ class CollaborationManager:
             
             # Remove from document session
             if document_id in self.document_sessions:
-                self.document_sessions[document_id]['users'].discard(user_id)
+                self.document_sessions[document_id].users.discard(user_id)
+                self._collaborator_cache.pop(document_id, None)
                 
                 # Clean up session if no more users
-                if not self.document_sessions[document_id]['users']:
+                if not self.document_sessions[document_id].users:
                     del self.document_sessions[document_id]
+                    self._history_cache.pop(document_id, None)
             
             # Release any locks held by this user
             await self._handle_lock_release(document_id, user_id)
             
             # Update user presence
             if user_id in self.user_presence:
-                self.user_presence[user_id]['status'] = 'offline'
+                self.user_presence[user_id].status = 'offline'
             
             # Notify other users
             disconnect_event = {
                 'type': 'user_left',
                 'user_id': user_id,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': time.time()
             }
             
             await self._broadcast_to_document(document_id, disconnect_event)
             
-            logger.info(f"User {user_id} disconnected from document {document_id}")
+            logger.info("User %s disconnected from document %s", user_id, document_id)
             
         except Exception as e:
-            logger.error(f"Error handling disconnect: {e}")
+            logger.error("Error handling disconnect: %s", e)
     
-    async def _log_collaboration_event(self, event_type: str, user_id: str, 
-                                     document_id: str, data: Dict[str, Any]):
-        """Log collaboration event for analytics"""
-        event = CollaborationEvent(
-            event_type=event_type,
-            user_id=user_id,
-            document_id=document_id,
-            data=data,
-            timestamp=datetime.utcnow()
-        )
+    def _log_collaboration_event(self, event_type: str, user_id: str, 
+                                 document_id: str, data: Dict[str, Any]):
+        """Queue collaboration event for analytics without blocking the handler"""
+        try:
+            self._event_queue.put_nowait((event_type, user_id, document_id, data, time.time()))
+        except asyncio.QueueFull:
+            self._events_dropped += 1
+            if self._events_dropped == 1:
+                logger.warning("Collaboration event queue full, dropping events")
+    
+    async def _drain_events(self):
+        """Write queued collaboration events in batches"""
+        while True:
+            batch = [await self._event_queue.get()]
+            while len(batch) < EVENT_BATCH_SIZE and not self._event_queue.empty():
+                batch.append(self._event_queue.get_nowait())
+            
+            try:
+                self._write_events(batch)
+            except Exception as e:
+                logger.error("Error writing collaboration events: %s", e)
+    
+    def _write_events(self, batch: List[Tuple[str, str, str, Dict[str, Any], float]]):
+        """Persist a batch of collaboration events"""
+        events = [
+            CollaborationEvent(
+                event_type=event_type,
+                user_id=user_id,
+                document_id=document_id,
+                data=data,
+                timestamp=datetime.fromtimestamp(ts, timezone.utc)
+            )
+            for event_type, user_id, document_id, data, ts in batch
+        ]
         
-        # In production, save to database
-        logger.info(f"Collaboration event: {event_type} by {user_id} on {document_id}")
+        # In production, bulk insert into database
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Recorded %s collaboration events", len(events))
     
     async def get_document_collaborators(self, document_id: str) -> List[Dict[str, Any]]:
         """Get list of current collaborators for a document"""
+        # Rebuilt only after a join, leave or heartbeat in the document
+        collaborators = self._collaborator_cache.get(document_id)
+        if collaborators is not None:
+            return collaborators
+        
         if document_id in self.document_sessions:
-            users = self.document_sessions[document_id]['users']
+            users = self.document_sessions[document_id].users
             collaborators = []
             
             for user_id in users:
-                presence = self.user_presence.get(user_id, {})
+                presence = self.user_presence.get(user_id)
                 collaborators.append({
                     'user_id': user_id,
-                    'status': presence.get('status', 'unknown'),
-                    'last_activity': presence.get('last_activity', '').isoformat() if presence.get('last_activity') else None
+                    'status': presence.status if presence else 'unknown',
+                    'last_activity': datetime.fromtimestamp(presence.last_activity, timezone.utc).isoformat() if presence else None
                 })
             
+            self._collaborator_cache[document_id] = collaborators
             return collaborators
         
         return []
@@ -421,47 +712,41 @@ class CollaborationManager:
         """Resolve version conflicts using operational transformation"""
         try:
             # Simple conflict resolution (in production, use sophisticated OT algorithms)
-            resolved_changes = []
-            
             # Sort changes by timestamp
-            sorted_changes = sorted(conflicting_changes, key=lambda x: x.get('timestamp', ''))
+            sorted_changes = sorted(conflicting_changes, key=_change_timestamp)
+            
+            # Extract positions and position shifts once, then transform in one pass
+            positions = [change.get('position', 0) for change in sorted_changes]
+            deltas = [
+                len(change.get('text', '')) if change.get('type') == 'insert'
+                else -change.get('length', 0) if change.get('type') == 'delete'
+                else 0
+                for change in sorted_changes
+            ]
+            
+            if NUMBA_AVAILABLE and len(sorted_changes) >= JIT_CONFLICT_THRESHOLD:
+                transformed = _transform_positions_jit(
+                    np.array(positions, dtype=np.int64), np.array(deltas, dtype=np.int64)
+                ).tolist()
+            else:
+                transformed = _transform_positions(positions, deltas)
             
-            for change in sorted_changes:
-                # Apply basic transformation
-                transformed_change = self._transform_change(change, resolved_changes)
-                resolved_changes.append(transformed_change)
+            resolved_changes = [
+                {**change, 'position': position}
+                for change, position in zip(sorted_changes, transformed)
+            ]
             
             return {
                 'status': 'resolved',
                 'resolved_changes': resolved_changes,
                 'resolution_strategy': 'chronological_ordering',
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': time.time()
             }
             
         except Exception as e:
-            logger.error(f"Error resolving version conflict: {e}")
+            logger.error("Error resolving version conflict: %s", e)
             return {
                 'status': 'failed',
                 'error': str(e),
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': time.time()
             }
-    
-    def _transform_change(self, change: Dict[str, Any], previous_changes: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Transform change based on previous changes (simplified OT)"""
-        # Simplified operational transformation
-        # In production, implement proper OT algorithms
-        
-        transformed_change = change.copy()
-        
-        # Adjust position based on previous insertions/deletions
-        position = change.get('position', 0)
-        for prev_change in previous_changes:
-            prev_position = prev_change.get('position', 0)
-            if prev_position <= position:
-                if prev_change.get('type') == 'insert':
-                    position += len(prev_change.get('text', ''))
-                elif prev_change.get('type') == 'delete':
-                    position -= prev_change.get('length', 0)
-        
-        transformed_change['position'] = max(0, position)
-        return transformed_change
\ No newline at end of file
@@ -4,49 +4,267 @@ Handles document uploads, OCR, table extraction, and multi-language support
 """
 
 import asyncio
+import concurrent.futures
+import glob
+import hashlib
+import importlib.util
+import itertools
+import mmap
 import os
+import queue
+import re
+import shutil
+import sys
+import tempfile
 import time
 import uuid
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 import logging
-from datetime import datetime
+import aiofiles
+import numpy as np
 from fastapi import UploadFile
 
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# With tesserocr, each pool worker keeps one engine loaded and gives it 4 threads.
+# OpenMP reads its thread limit once, when tesserocr loads it, so the limit is set
+# before the import; forked pool workers inherit the runtime configured here.
+OCR_THREADS_PER_WORKER = 4
+if importlib.util.find_spec('tesserocr') is not None:
+    os.environ.setdefault('OMP_THREAD_LIMIT', str(OCR_THREADS_PER_WORKER))
+
+try:
+    from tesserocr import PyTessBaseAPI
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Pages are OCR'd in parallel Tesseract processes, each kept single-threaded
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 1))
+OCR_DPI = 300
+OCR_ENV = {**os.environ, 'OMP_THREAD_LIMIT': '1'}
+
+# One tesserocr pool worker per OCR_THREADS_PER_WORKER cores
+OCR_POOL_WORKERS = max(1, OCR_CONCURRENCY // OCR_THREADS_PER_WORKER)
+
+# Upper bound on images handed to one engine call; Tesseract separates their text with form feeds
+OCR_BATCH_SIZE = 160
+
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Linux can sendfile() between regular files, letting the kernel copy uploads without userspace buffers
+ZERO_COPY_UPLOADS = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+# Path traversal, Windows separators and NUL bytes are rejected in upload filenames
+UNSAFE_FILENAME = re.compile(r'\.\./|\\|\x00')
+
+# Structure analyses kept for re-uploads of identical content (least recently used evicted first)
+STRUCTURE_CACHE_SIZE = 4096
+
+# Numbered section lines ("1." .. "9.")
+SECTION_PREFIXES = ('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')
+
+# Bates stamp prefixes whose digit runs are normalized after OCR
+BATES_PREFIXES = ('BATES', 'PROD', 'PLTF', 'DEF', 'PL')
+
+# OCR misreads on structured fields: letter O inside numbers ("2O24", "$1O,OOO")
+# and Bates stamps with O for 0 in the digit run ("DEFOOO1234" -> "DEF0001234"); digits
+# after a space are left alone, since they are as likely a year or page count as a split stamp
+OCR_NUMERIC_TOKEN = re.compile(r'(?<!\w)(?=[\dO,.]*\d)[\dO]+(?:[,.][\dO]+)*(?!\w)')
+OCR_BATES_NUMBER = re.compile(
+    r'\b((?:' + '|'.join(map(re.escape, sorted(BATES_PREFIXES, key=len, reverse=True))) + r')[_-]?)'
+    r'([\dO]{3,})\b'
+)
+
+def _zero_for_letter_o(match: re.Match) -> str:
+    """Read every letter O in a numeric token as a zero"""
+    return match.group(0).replace('O', '0')
+
+def _normalize_bates_number(match: re.Match) -> str:
+    """Read letter O as zero in a Bates number's digit run"""
+    prefix, number = match.groups()
+    if not any(ch.isdigit() for ch in number):
+        return match.group(0)
+    return prefix + number.replace('O', '0')
+
+OCR_FIXES: Sequence[Tuple[re.Pattern, Callable[[re.Match], str]]] = (
+    (OCR_BATES_NUMBER, _normalize_bates_number),
+    (OCR_NUMERIC_TOKEN, _zero_for_letter_o),
+)
+
+# Returned when Tesseract/poppler are not installed (local development)
+SIMULATED_PDF_TEXT = """
+        PROFESSIONAL SERVICES AGREEMENT
+        
+        This Agreement is entered into between Company A and Company B for the provision of software development services.
+        
+        1. SCOPE OF WORK
+        The Contractor shall provide software development services including but not limited to:
+        - Web application development
+        - Database design and implementation
+        - API development and integration
+        
+        2. PAYMENT TERMS
+        Payment shall be made within thirty (30) days of invoice receipt.
+        Total contract value: $50,000
+        
+        3. INTELLECTUAL PROPERTY
+        All work product shall be owned by the Client upon full payment.
+        
+        4. TERMINATION
+        Either party may terminate this agreement with thirty (30) days written notice.
+        
+        5. LIABILITY
+        Contractor's liability shall be limited to the amount paid under this agreement.
+        """
+
+SIMULATED_IMAGE_TEXT = """
+        AMENDMENT TO CONTRACT
+        
+        This amendment modifies the original contract dated January 1, 2024.
+        
+        CHANGES:
+        1. Extend deadline by 30 days
+        2. Increase budget by $10,000
+        3. Add additional deliverable: Mobile app version
+        
+        Signatures:
+        [Handwritten signature] John Smith, CEO
+        [Handwritten signature] Jane Doe, Project Manager
+        """
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """Grey level that best separates ink from paper (Otsu's method)"""
+    counts = np.asarray(histogram, dtype=np.float64)
+    weight_dark = np.cumsum(counts)
+    weight_light = weight_dark[-1] - weight_dark
+    mass_dark = np.cumsum(counts * np.arange(len(counts)))
+    mean_dark = mass_dark / np.maximum(weight_dark, 1)
+    mean_light = (mass_dark[-1] - mass_dark) / np.maximum(weight_light, 1)
+    return int(np.argmax(weight_dark * weight_light * (mean_dark - mean_light) ** 2))
+
+def _binarize_for_ocr(image_path: str) -> 'Image.Image':
+    """Convert a page image to clean black and white, which Tesseract reads faster and more accurately"""
+    with Image.open(image_path) as image:
+        gray = image.convert('L')
+    threshold = _otsu_threshold(gray.histogram())
+    return gray.point([0] * (threshold + 1) + [255] * (255 - threshold), mode='1')
+
+def _write_binarized_page(image_path: str, output_path: str) -> str:
+    """Save a binarized page as 300 DPI Group 4 TIFF for the tesseract CLI"""
+    _binarize_for_ocr(image_path).save(output_path, compression='group4', dpi=(OCR_DPI, OCR_DPI))
+    return output_path
+
+# Per-process Tesseract handle, created once by _init_ocr_worker
+_ocr_api = None
+
+def _init_ocr_worker():
+    """Load the Tesseract engine once in an OCR pool worker process"""
+    global _ocr_api
+    _ocr_api = PyTessBaseAPI(lang='eng')
+
+def _ocr_image_in_worker(image_path: str) -> str:
+    """OCR one image with the worker's long-lived Tesseract handle"""
+    if PIL_AVAILABLE:
+        _ocr_api.SetImage(_binarize_for_ocr(image_path))
+    else:
+        _ocr_api.SetImageFile(image_path)
+    return _ocr_api.GetUTF8Text()
+
+def _ocr_images_in_worker(image_paths: List[str]) -> List[str]:
+    """OCR a batch of images with the worker's long-lived Tesseract handle"""
+    return [_ocr_image_in_worker(image_path) for image_path in image_paths]
+
+class BufferPool:
+    """Reusable bytearrays in size buckets, so upload copies don't reallocate per chunk"""
+    
+    def __init__(self, bucket_sizes=(1 << 16, UPLOAD_CHUNK_SIZE), max_buffers: int = 32):
+        self._bucket_sizes = sorted(bucket_sizes)
+        self._pools = {size: queue.LifoQueue(maxsize=max_buffers) for size in self._bucket_sizes}
+    
+    def acquire(self, size: int) -> bytearray:
+        """Return a buffer of at least size bytes, reusing a pooled one when available"""
+        for bucket_size in self._bucket_sizes:
+            if bucket_size >= size:
+                try:
+                    return self._pools[bucket_size].get_nowait()
+                except queue.Empty:
+                    return bytearray(bucket_size)
+        return bytearray(size)
+    
+    def release(self, buffer: bytearray):
+        """Return a buffer to its bucket; dropped if unpooled size or the bucket is full"""
+        pool = self._pools.get(len(buffer))
+        if pool is not None:
+            try:
+                pool.put_nowait(buffer)
+            except queue.Full:
+                pass
+
 class DocumentProcessor:
     """Advanced document processing with OCR and multi-language support"""
     
     def __init__(self):
-        self.supported_formats = ['.pdf', '.docx', '.doc', '.txt', '.rtf', '.png', '.jpg', '.jpeg']
+        self.supported_formats = frozenset(('.pdf', '.docx', '.doc', '.txt', '.rtf', '.png', '.jpg', '.jpeg'))
         self.upload_dir = "/tmp/uploads"
         self.processed_dir = "/tmp/processed"
         self.max_file_size = 50 * 1024 * 1024  # 50MB
+        self.tesseract_cmd = shutil.which('tesseract')
+        self.pdftocairo_cmd = shutil.which('pdftocairo')
+        self._ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+        self._ocr_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._buffer_pool = BufferPool()
+        self._structure_cache: Dict[bytes, Dict[str, Any]] = {}  # content digest -> structure
+        self._extractors = {
+            '.txt': self._extract_text_file,
+            '.pdf': self._extract_pdf_content,
+            '.docx': self._extract_word_content,
+            '.doc': self._extract_word_content,
+            '.png': self._extract_image_content,
+            '.jpg': self._extract_image_content,
+            '.jpeg': self._extract_image_content
+        }
         
     async def initialize(self):
         """Initialize document processor"""
         os.makedirs(self.upload_dir, exist_ok=True)
         os.makedirs(self.processed_dir, exist_ok=True)
+        if TESSEROCR_AVAILABLE:
+            self._ocr_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=OCR_POOL_WORKERS,
+                initializer=_init_ocr_worker
+            )
         logger.info("Document processor initialized")
         
     async def cleanup(self):
         """Cleanup resources"""
+        if self._ocr_pool:
+            self._ocr_pool.shutdown(cancel_futures=True)
+            self._ocr_pool = None
         logger.info("Document processor cleanup complete")
     
     async def process_upload(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
         """Process uploaded document"""
         try:
             # Validate file
-            await self._validate_file(file)
+            file_extension = os.path.splitext(file.filename)[1].lower()
+            await self._validate_file(file, file_extension)
             
             # Generate unique document ID
             document_id = str(uuid.uuid4())
             
             # Save file
-            file_path = await self._save_file(file, document_id)
+            file_path, content_hash = await self._save_file(file, document_id, file_extension)
             
             # Extract text and metadata
-            extraction_result = await self._extract_content(file_path, file.filename)
+            extraction_result = await self._extract_content(file_path, file_extension)
             
             # Store document metadata
             document_metadata = {
@@ -55,7 +273,8 @@ class DocumentProcessor:
                 'filename': file.filename,
                 'file_size': file.size,
                 'content_type': file.content_type,
-                'upload_time': datetime.utcnow().isoformat(),
+                'sha256': content_hash,
+                'upload_time': time.time_ns(),  # Unix epoch nanoseconds (UTC)
                 'extraction_result': extraction_result
             }
             
@@ -65,49 +284,87 @@ class DocumentProcessor:
             logger.error(f"Document processing failed: {e}")
             raise
     
-    async def _validate_file(self, file: UploadFile):
+    async def _validate_file(self, file: UploadFile, file_extension: str):
         """Validate uploaded file"""
         # Check file size
         if file.size > self.max_file_size:
             raise ValueError(f"File size exceeds maximum limit of {self.max_file_size} bytes")
         
         # Check file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
         if file_extension not in self.supported_formats:
             raise ValueError(f"File format {file_extension} not supported")
         
         # Basic security check
-        if '../' in file.filename or '\\' in file.filename:
+        if UNSAFE_FILENAME.search(file.filename):
             raise ValueError("Invalid filename")
     
-    async def _save_file(self, file: UploadFile, document_id: str) -> str:
-        """Save uploaded file to disk"""
-        file_extension = os.path.splitext(file.filename)[1]
+    async def _save_file(self, file: UploadFile, document_id: str, file_extension: str) -> Tuple[str, str]:
+        """Save uploaded file to disk, returning its path and SHA-256 hex digest"""
         file_path = os.path.join(self.upload_dir, f"{document_id}{file_extension}")
         
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        if ZERO_COPY_UPLOADS:
+            content_hash = await asyncio.to_thread(self._copy_spooled_upload, file.file, file_path)
+            return file_path, content_hash
         
-        return file_path
+        # Stream in fixed chunks through one pooled buffer, hashing as we go; reads and writes run off the event loop
+        hasher = hashlib.sha256()
+        chunk = self._buffer_pool.acquire(UPLOAD_CHUNK_SIZE)
+        try:
+            with memoryview(chunk) as view:
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    while size := await asyncio.to_thread(file.file.readinto, chunk):
+                        hasher.update(view[:size])
+                        await buffer.write(view[:size])
+        finally:
+            self._buffer_pool.release(chunk)
+        
+        return file_path, hasher.hexdigest()
     
-    async def _extract_content(self, file_path: str, filename: str) -> Dict[str, Any]:
+    def _copy_spooled_upload(self, source, file_path: str) -> str:
+        """Copy an upload's spooled temp file to disk without reading it into Python, returning its SHA-256"""
+        hasher = hashlib.sha256()
+        with open(file_path, "wb") as destination:
+            # SpooledTemporaryFile keeps small uploads in a BytesIO until it rolls over to disk
+            if not getattr(source, '_rolled', True):
+                with source._file.getbuffer() as content:
+                    hasher.update(content)
+                    destination.write(content)
+                return hasher.hexdigest()
+            
+            try:
+                source_fd = source.fileno()
+            except (AttributeError, OSError):
+                source.seek(0)
+                chunk = self._buffer_pool.acquire(UPLOAD_CHUNK_SIZE)
+                try:
+                    with memoryview(chunk) as view:
+                        while size := source.readinto(chunk):
+                            hasher.update(view[:size])
+                            destination.write(view[:size])
+                finally:
+                    self._buffer_pool.release(chunk)
+                return hasher.hexdigest()
+            
+            offset, size = 0, os.fstat(source_fd).st_size
+            while offset < size:
+                sent = os.sendfile(destination.fileno(), source_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        
+        # The kernel did the copy, so hash the source through a read-only mapping of the page cache
+        if size:
+            with mmap.mmap(source_fd, size, access=mmap.ACCESS_READ) as content:
+                hasher.update(content)
+        return hasher.hexdigest()
+    
+    async def _extract_content(self, file_path: str, file_extension: str) -> Dict[str, Any]:
         """Extract content from document using OCR and text extraction"""
         start_time = time.time()
         
-        file_extension = os.path.splitext(filename)[1].lower()
-        
         try:
-            if file_extension == '.txt':
-                result = await self._extract_text_file(file_path)
-            elif file_extension == '.pdf':
-                result = await self._extract_pdf_content(file_path)
-            elif file_extension in ['.docx', '.doc']:
-                result = await self._extract_word_content(file_path)
-            elif file_extension in ['.png', '.jpg', '.jpeg']:
-                result = await self._extract_image_content(file_path)
-            else:
-                result = {'text': 'Unsupported file format', 'metadata': {}}
+            extractor = self._extractors.get(file_extension, self._extract_unsupported)
+            result = await extractor(file_path)
             
             processing_time = time.time() - start_time
             result['processing_time'] = processing_time
@@ -122,10 +379,19 @@ class DocumentProcessor:
                 'processing_time': time.time() - start_time
             }
     
+    async def _extract_unsupported(self, file_path: str) -> Dict[str, Any]:
+        """Placeholder result for accepted formats without an extractor"""
+        return {'text': 'Unsupported file format', 'metadata': {}}
+    
     async def _extract_text_file(self, file_path: str) -> Dict[str, Any]:
         """Extract content from text file"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        async with aiofiles.open(file_path, 'rb') as f:
+            raw = await f.read()
+        
+        # One-shot decode; fold line endings the way text mode would
+        content = raw.decode('utf-8', errors='replace')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
         
         return {
             'text': content,
@@ -140,78 +406,54 @@ class DocumentProcessor:
         }
     
     async def _extract_pdf_content(self, file_path: str) -> Dict[str, Any]:
-        """Extract content from PDF using OCR (simulated)"""
-        # Simulate PDF processing
-        await asyncio.sleep(1.0)
-        
-        # Mock extracted content
-        content = """
-        PROFESSIONAL SERVICES AGREEMENT
-        
-        This Agreement is entered into between Company A and Company B for the provision of software development services.
-        
-        1. SCOPE OF WORK
-        The Contractor shall provide software development services including but not limited to:
-        - Web application development
-        - Database design and implementation
-        - API development and integration
-        
-        2. PAYMENT TERMS
-        Payment shall be made within thirty (30) days of invoice receipt.
-        Total contract value: $50,000
-        
-        3. INTELLECTUAL PROPERTY
-        All work product shall be owned by the Client upon full payment.
-        
-        4. TERMINATION
-        Either party may terminate this agreement with thirty (30) days written notice.
-        
-        5. LIABILITY
-        Contractor's liability shall be limited to the amount paid under this agreement.
-        """
-        
-        # Simulate table extraction
-        tables = [
-            {
-                'table_id': 1,
-                'location': 'page 1',
-                'data': [
-                    ['Milestone', 'Deliverable', 'Payment'],
-                    ['Phase 1', 'Design Documents', '$15,000'],
-                    ['Phase 2', 'Development', '$25,000'],
-                    ['Phase 3', 'Testing & Deployment', '$10,000']
-                ]
-            }
-        ]
-        
-        # Simulate signature detection
-        signatures = [
-            {
-                'signature_id': 1,
-                'location': 'page 2, bottom',
-                'confidence': 0.85,
-                'type': 'handwritten'
-            }
-        ]
+        """Extract content from PDF using OCR, with table and signature detection running alongside"""
+        if not (self._ocr_available() and self.pdftocairo_cmd):
+            return await self._extract_pdf_pages(file_path, None)
+        
+        # Rasterize once; OCR, table and signature detection all read the same page images
+        with tempfile.TemporaryDirectory(prefix='ocr_') as page_dir:
+            page_paths = await self._rasterize_pdf(file_path, page_dir)
+            return await self._extract_pdf_pages(file_path, page_paths)
+    
+    async def _extract_pdf_pages(self, file_path: str, page_paths: Optional[List[str]]) -> Dict[str, Any]:
+        """Run text, table and signature extraction over a PDF's rasterized pages"""
+        tables_task = asyncio.create_task(self.extract_tables_advanced(file_path, pages=page_paths))
+        signatures_task = asyncio.create_task(self.detect_signatures_advanced(file_path, pages=page_paths))
+        try:
+            content, pages = await self._extract_pdf_text(page_paths)
+            structure = self._analyze_document_structure(content)
+            tables, signatures = await asyncio.gather(tables_task, signatures_task)
+        finally:
+            tables_task.cancel()
+            signatures_task.cancel()
         
         return {
             'text': content,
             'metadata': {
                 'type': 'pdf',
-                'pages': 2,
+                'pages': pages,
                 'word_count': len(content.split()),
                 'ocr_confidence': 0.92
             },
             'tables': tables,
             'signatures': signatures,
-            'structure': self._analyze_document_structure(content)
+            'structure': structure
         }
     
+    async def _extract_pdf_text(self, page_paths: Optional[List[str]]) -> Tuple[str, int]:
+        """OCR a PDF's page images, returning the text with the page count"""
+        if page_paths is not None:
+            page_texts = await self._batch_ocr(page_paths)
+            content = '\n'.join(page_texts)
+            pages = len(page_texts)
+        else:
+            # Simulated PDF text
+            content = SIMULATED_PDF_TEXT
+            pages = 2
+        return self._postprocess_structured(content), pages
+    
     async def _extract_word_content(self, file_path: str) -> Dict[str, Any]:
         """Extract content from Word document (simulated)"""
-        # Simulate Word document processing
-        await asyncio.sleep(0.5)
-        
         content = """
         SERVICE LEVEL AGREEMENT
         
@@ -240,30 +482,35 @@ class DocumentProcessor:
         }
     
     async def _extract_image_content(self, file_path: str) -> Dict[str, Any]:
-        """Extract content from image using OCR (simulated)"""
-        # Simulate Google Vision API / Azure Form Recognizer
-        await asyncio.sleep(1.5)
-        
-        content = """
-        AMENDMENT TO CONTRACT
-        
-        This amendment modifies the original contract dated January 1, 2024.
-        
-        CHANGES:
-        1. Extend deadline by 30 days
-        2. Increase budget by $10,000
-        3. Add additional deliverable: Mobile app version
-        
-        Signatures:
-        [Handwritten signature] John Smith, CEO
-        [Handwritten signature] Jane Doe, Project Manager
-        """
+        """Extract content from image using OCR"""
+        if self._ocr_available():
+            content = (await self._batch_ocr([file_path]))[0]
+        else:
+            # Simulated Google Vision API / Azure Form Recognizer output
+            content = SIMULATED_IMAGE_TEXT
+        content = self._postprocess_structured(content)
         
         # Simulate handwriting detection
         handwriting_regions = [
             {'text': 'John Smith, CEO', 'confidence': 0.78, 'location': 'bottom left'},
             {'text': 'Jane Doe, Project Manager', 'confidence': 0.82, 'location': 'bottom right'}
         ]
+        signatures = [
+            {
+                'signature_id': 1,
+                'text': 'John Smith, CEO',
+                'confidence': 0.78,
+                'type': 'handwritten'
+            },
+            {
+                'signature_id': 2,
+                'text': 'Jane Doe, Project Manager',
+                'confidence': 0.82,
+                'type': 'handwritten'
+            }
+        ]
+        for region in (*handwriting_regions, *signatures):
+            region['text'] = self._postprocess_structured(region['text'])
         
         return {
             'text': content,
@@ -274,75 +521,143 @@ class DocumentProcessor:
                 'handwriting_detected': True
             },
             'tables': [],
-            'signatures': [
-                {
-                    'signature_id': 1,
-                    'text': 'John Smith, CEO',
-                    'confidence': 0.78,
-                    'type': 'handwritten'
-                },
-                {
-                    'signature_id': 2,
-                    'text': 'Jane Doe, Project Manager',
-                    'confidence': 0.82,
-                    'type': 'handwritten'
-                }
-            ],
+            'signatures': signatures,
             'handwriting_regions': handwriting_regions,
             'structure': self._analyze_document_structure(content)
         }
     
-    def _analyze_document_structure(self, content: str) -> Dict[str, Any]:
-        """Analyze document structure (headers, sections, clauses)"""
-        lines = content.strip().split('\n')
-        
-        structure = {
-            'title': '',
-            'sections': [],
-            'clauses': [],
-            'headers': []
-        }
-        
-        # Simple structure analysis
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Identify title (usually first non-empty line)
-            if not structure['title'] and len(line) > 10:
-                structure['title'] = line
-            
-            # Identify numbered sections
-            if line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
-                structure['sections'].append({
-                    'number': line.split('.')[0],
-                    'title': line,
-                    'line_number': i + 1
-                })
-            
-            # Identify headers (all caps lines)
-            if line.isupper() and len(line) > 5:
-                structure['headers'].append({
-                    'text': line,
-                    'line_number': i + 1
-                })
+    def _postprocess_structured(self, text: str, patterns: Sequence[Tuple[re.Pattern, Callable]] = OCR_FIXES) -> str:
+        """Normalize common OCR misreads in numbers, dates and Bates stamps"""
+        for pattern, fix in patterns:
+            text = pattern.sub(fix, text)
+        return text
+    
+    def _ocr_available(self) -> bool:
+        """Whether OCR can run (tesserocr worker pool or tesseract CLI)"""
+        return self._ocr_pool is not None or self.tesseract_cmd is not None
+    
+    async def _rasterize_pdf(self, file_path: str, output_dir: str) -> List[str]:
+        """Render PDF pages to PNG images with pdftocairo"""
+        process = await asyncio.create_subprocess_exec(
+            self.pdftocairo_cmd, '-png', '-r', str(OCR_DPI), file_path, os.path.join(output_dir, 'page'),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"PDF rasterization failed: {stderr.decode(errors='replace').strip()}")
+        
+        # pdftocairo zero-pads page numbers, so lexical order is page order
+        return sorted(glob.glob(os.path.join(output_dir, 'page-*.png')))
+    
+    async def _batch_ocr(self, image_paths: List[str], batch_size: int = OCR_BATCH_SIZE) -> List[str]:
+        """OCR images in batches so engine startup is paid per batch, not per image"""
+        if not image_paths:
+            return []
+        
+        # Never use fewer batches than OCR workers, so small documents still run in parallel
+        batch_size = max(1, min(batch_size, -(-len(image_paths) // OCR_CONCURRENCY)))
+        batches = [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+        results = await asyncio.gather(*(self._ocr_batch(batch) for batch in batches))
+        return [text for batch_texts in results for text in batch_texts]
+    
+    async def _ocr_batch(self, image_paths: List[str]) -> List[str]:
+        """OCR one batch of images in a single engine call"""
+        if self._ocr_pool:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._ocr_pool, _ocr_images_in_worker, image_paths)
+        
+        with tempfile.TemporaryDirectory(prefix='ocr_batch_') as batch_dir:
+            if PIL_AVAILABLE:
+                image_paths = await asyncio.gather(*(
+                    asyncio.to_thread(_write_binarized_page, image_path, os.path.join(batch_dir, f'{i:04d}.tif'))
+                    for i, image_path in enumerate(image_paths)
+                ))
             
-            # Identify potential clauses
-            if any(keyword in line.lower() for keyword in ['shall', 'will', 'must', 'required', 'prohibited']):
-                structure['clauses'].append({
-                    'text': line,
-                    'line_number': i + 1,
-                    'type': 'obligation'
-                })
-        
+            # The tesseract CLI treats a .txt input as a list of images to process in one run
+            image_list = os.path.join(batch_dir, 'images.txt')
+            with open(image_list, 'w') as f:
+                f.write('\n'.join(image_paths) + '\n')
+            text = await self._ocr_page(image_list)
+        
+        texts = text.split('\f')[:len(image_paths)]
+        if len(texts) != len(image_paths):
+            raise RuntimeError(f"OCR returned {len(texts)} pages for {len(image_paths)} images")
+        return texts
+    
+    async def _ocr_page(self, image_path: str) -> str:
+        """OCR one page image (or .txt image list) with the tesseract CLI, bounded by OCR_CONCURRENCY"""
+        async with self._ocr_semaphore:
+            process = await asyncio.create_subprocess_exec(
+                self.tesseract_cmd, image_path, 'stdout',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=OCR_ENV
+            )
+            stdout, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"OCR failed: {stderr.decode(errors='replace').strip()}")
+        return stdout.decode('utf-8', errors='replace')
+    
+    def _analyze_document_structure(self, content: str) -> Dict[str, Any]:
+        """Analyze document structure (headers, sections, clauses), cached by content digest"""
+        key = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        structure = self._structure_cache.pop(key, None)
+        if structure is None:
+            structure = self._build_document_structure(content)
+            if len(self._structure_cache) >= STRUCTURE_CACHE_SIZE:
+                del self._structure_cache[next(iter(self._structure_cache))]
+        
+        # Re-inserting keeps the dict ordered from least to most recently used
+        self._structure_cache[key] = structure
         return structure
     
-    async def extract_tables_advanced(self, file_path: str) -> List[Dict[str, Any]]:
-        """Advanced table extraction with formatting preservation"""
-        # Simulate advanced table extraction
-        await asyncio.sleep(0.8)
+    def _build_document_structure(self, content: str) -> Dict[str, Any]:
+        """Scan document lines for headers, sections and clauses"""
+        lines = list(map(str.strip, content.strip().split('\n')))
+        line_count = len(lines)
+        
+        # Every check is a whole-document mask: map() keeps the per-line work in C,
+        # and str methods keep Unicode semantics. Empty lines fail every check.
+        lengths = np.fromiter(map(len, lines), dtype=np.intp, count=line_count)
+        is_upper = np.fromiter(map(str.isupper, lines), dtype=np.bool_, count=line_count)
+        is_section = np.fromiter(
+            map(str.startswith, lines, itertools.repeat(SECTION_PREFIXES)), dtype=np.bool_, count=line_count
+        )
+        
+        # Chained substring tests beat one map() pass per keyword
+        is_clause = np.fromiter(
+            [('shall' in line or 'will' in line or 'must' in line or 'required' in line or 'prohibited' in line)
+             for line in map(str.lower, lines)],
+            dtype=np.bool_, count=line_count
+        )
+        
+        title_idx = np.flatnonzero(lengths > 10)
         
+        return {
+            # Title is usually the first non-empty line long enough to be one
+            'title': lines[title_idx[0]] if title_idx.size else '',
+            # Numbered sections
+            'sections': [
+                {'number': lines[i][0], 'title': lines[i], 'line_number': i + 1}
+                for i in np.flatnonzero(is_section).tolist()
+            ],
+            # Potential obligation clauses
+            'clauses': [
+                {'text': lines[i], 'line_number': i + 1, 'type': 'obligation'}
+                for i in np.flatnonzero(is_clause).tolist()
+            ],
+            # Headers are all caps lines
+            'headers': [
+                {'text': lines[i], 'line_number': i + 1}
+                for i in np.flatnonzero(is_upper & (lengths > 5)).tolist()
+            ]
+        }
+    
+    async def extract_tables_advanced(self, file_path: str, pages: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Advanced table extraction with formatting preservation; pages reuses already rasterized page images"""
+        # Simulated advanced table extraction
         return [
             {
                 'table_id': 1,
@@ -362,11 +677,9 @@ class DocumentProcessor:
             }
         ]
     
-    async def detect_signatures_advanced(self, file_path: str) -> List[Dict[str, Any]]:
-        """Advanced signature detection and validation"""
-        # Simulate signature detection with Azure Form Recognizer
-        await asyncio.sleep(0.6)
-        
+    async def detect_signatures_advanced(self, file_path: str, pages: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Advanced signature detection and validation; pages reuses already rasterized page images"""
+        # Simulated signature detection with Azure Form Recognizer
         return [
             {
                 'signature_id': 1,
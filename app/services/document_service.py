@@ -2,11 +2,22 @@
 Document parsing and intelligence analysis service.
 """
 
+import asyncio
+import functools
+import hashlib
+import heapq
 import logging
+import math
 import re
+import string
+import time
+from collections import Counter, OrderedDict
+from itertools import islice
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+
 # Import optional dependencies
 try:
     import PyPDF2
@@ -27,30 +38,130 @@ except ImportError:
     SPACY_AVAILABLE = False
 
 try:
-    import nltk
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    NLTK_AVAILABLE = True
+    import re2
+    RE2_AVAILABLE = True
 except ImportError:
-    NLTK_AVAILABLE = False
+    RE2_AVAILABLE = False
 
 try:
-    from textstat import flesch_reading_ease, flesch_kincaid_grade
-    TEXTSTAT_AVAILABLE = True
+    from pyphen import Pyphen
+    PYPHEN_AVAILABLE = True
 except ImportError:
-    TEXTSTAT_AVAILABLE = False
+    PYPHEN_AVAILABLE = False
 
 from app.services.translation_service import LegalTranslationEngine
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Download required NLTK data
-if NLTK_AVAILABLE:
-    try:
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-    except:
-        pass
+# Whole-document pattern scans use RE2's linear-time matcher when installed.
+SCAN_RE = re2 if RE2_AVAILABLE else re
+
+# Scan patterns are written in lowercase. RE2 folds case inside its automaton at
+# no extra cost, so its patterns get an inline (?i) (its API has no flag
+# arguments). sre matches case-insensitive patterns several times slower, so
+# without RE2 the text is case-folded once per document and scanned with plain
+# patterns instead.
+SCAN_CASE_FLAG = "(?i)" if RE2_AVAILABLE else ""
+
+# Folding for non-ASCII text: ASCII letters are lowercased and the characters
+# sre's IGNORECASE matches to an ASCII letter (dotted/dotless I, long s, Kelvin
+# sign) map to it. Everything else is kept as is, so offsets and \w/\b still
+# line up with the original text. RE2's (?i) does not match those four
+# characters to ASCII letters, so non-ASCII text is folded for RE2 as well.
+SCAN_FOLD_TABLE = {
+    **{ord(c): c.lower() for c in string.ascii_uppercase},
+    0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"
+}
+
+
+def _fold_for_scan(content: str) -> str:
+    """Text to run the scan patterns over, case-folded unless RE2 can fold it itself."""
+    if content.isascii():
+        return content if RE2_AVAILABLE else content.lower()
+    return content.translate(SCAN_FOLD_TABLE)
+
+
+def _compile_pattern_set(patterns) -> Optional["re2.Set"]:
+    """Compile scan patterns into one RE2 set that reports which of them occur in a single pass."""
+    if not RE2_AVAILABLE:
+        return None
+    pattern_set = re2.Set.SearchSet(re2.Options())
+    for pattern in patterns:
+        pattern_set.Add(pattern.pattern)
+    pattern_set.Compile()
+    return pattern_set
+
+# Result limits. Each pattern only needs to be scanned until it has produced
+# this many matches; later matches can never make the position-sorted cut.
+MAX_KEY_SECTIONS = 20
+MAX_IMPORTANT_DATES = 10
+MAX_LEGAL_TERMS = 15
+
+# A risk level saturates at 5, which even the lowest base score reaches by
+# the fifth occurrence, so counting further matches cannot change the result.
+MAX_RISK_OCCURRENCES = 5
+
+# Party detection only reads the opening of a document
+PARTY_SCAN_CHARS = 1000
+
+# spaCy only runs NER for party detection; the other pipes are skipped
+SPACY_DISABLED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+SPACY_BATCH_SIZE = 64
+SPACY_PARTY_LABELS = {"ORG", "PERSON"}
+
+# Whitespace lookup for word counting, indexed by code point. Every character
+# str.isspace() accepts is below U+3001; higher code points clamp to the last,
+# non-space slot.
+WHITESPACE_TABLE = np.zeros(0x3002, dtype=bool)
+WHITESPACE_TABLE[[c for c in range(0x3001) if chr(c).isspace()]] = True
+
+
+def _count_words(content: str) -> int:
+    """Count whitespace-separated words, as len(content.split()) would, without building the list."""
+    if not content:
+        return 0
+    if content.isascii():
+        codes = np.frombuffer(content.encode("ascii"), dtype=np.uint8)
+    else:
+        codes = np.minimum(np.frombuffer(content.encode("utf-32-le", "surrogatepass"), dtype=np.uint32), 0x3001)
+    is_space = WHITESPACE_TABLE[codes]
+    # A word starts at the first character or wherever a space gives way to a non-space
+    return int(np.count_nonzero(is_space[:-1] & ~is_space[1:])) + (not is_space[0])
+
+
+def get_context(content: str, start: int, end: int) -> str:
+    """Text of a match's surrounding context, as shown to users."""
+    return content[start:end].strip()
+
+
+def _resolve_context(item: Dict, content: str, field: str) -> Dict:
+    """Copy an analysis item, replacing its context offsets with the context text under field."""
+    resolved = {}
+    for key, value in item.items():
+        if key == "context_start":
+            resolved[field] = get_context(content, value, item["context_end"])
+        elif key != "context_end":
+            resolved[key] = value
+    return resolved
+
+
+def _legacy_round(number: float, points: int) -> float:
+    """Round half away from zero, as textstat reports its scores."""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+
+# Section types that become critical for a given document type
+CRITICAL_SECTIONS_BY_DOCUMENT_TYPE = {
+    "employment": {"obligations", "termination", "payment"},
+    "lease": {"payment", "termination", "obligations"},
+    "privacy_policy": {"privacy", "rights"}
+}
+
+# Analyses are memoized by content hash so retried or repeated uploads skip the pipeline
+ANALYSIS_CACHE_TTL_SECONDS = 600
+ANALYSIS_CACHE_MAX_ENTRIES = 256
 
 
 class DocumentAnalysisService:
@@ -59,122 +170,307 @@ class DocumentAnalysisService:
     def __init__(self):
         self.translation_engine = LegalTranslationEngine()
         
-        # Load spaCy model for NLP
-        try:
-            if SPACY_AVAILABLE:
-                self.nlp = spacy.load("en_core_web_sm")
-            else:
-                self.nlp = None
-        except OSError:
-            logger.warning("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
-            self.nlp = None
+        # (content digest, document type) -> (expiry, analysis), least recently used first
+        self._analysis_cache: "OrderedDict[Tuple[bytes, Optional[str]], Tuple[float, Dict]]" = OrderedDict()
+        
+        # Sentence splitting for structure analysis
+        self._sentence_break_re = re.compile(r"(?<=[.!?])\s+")
         
-        # Legal document patterns
+        # Readability counting, following textstat's English rules
+        self._punctuation_re = re.compile(r"[^\w\s]")
+        self._readability_sentence_re = re.compile(r"\b[^.!?]+[.!?]*")
+        self._hyphenator = Pyphen(lang="en_US") if PYPHEN_AVAILABLE else None
+        
+        # Legal document patterns (compiled once, reused for every document)
+        self.section_patterns = {
+            "definitions": r"(definitions?|defined terms?)",
+            "obligations": r"(obligations?|duties|responsibilities|shall|must)",
+            "rights": r"(rights?|entitled|may|authorized)",
+            "termination": r"(termination|terminate|end|expir|cancel)",
+            "payment": r"(payment|fee|cost|charge|price|amount)",
+            "liability": r"(liability|liable|responsible|damages)",
+            "dispute": r"(dispute|arbitration|litigation|court|legal action)",
+            "privacy": r"(privacy|confidential|personal information|data)",
+            "intellectual_property": r"(intellectual property|copyright|trademark|patent)",
+            "force_majeure": r"(force majeure|act of god|unforeseeable)"
+        }
         self.section_patterns = {
-            "definitions": r"(?i)(definitions?|defined terms?)",
-            "obligations": r"(?i)(obligations?|duties|responsibilities|shall|must)",
-            "rights": r"(?i)(rights?|entitled|may|authorized)",
-            "termination": r"(?i)(termination|terminate|end|expir|cancel)",
-            "payment": r"(?i)(payment|fee|cost|charge|price|amount)",
-            "liability": r"(?i)(liability|liable|responsible|damages)",
-            "dispute": r"(?i)(dispute|arbitration|litigation|court|legal action)",
-            "privacy": r"(?i)(privacy|confidential|personal information|data)",
-            "intellectual_property": r"(?i)(intellectual property|copyright|trademark|patent)",
-            "force_majeure": r"(?i)(force majeure|act of god|unforeseeable)"
+            name: SCAN_RE.compile(SCAN_CASE_FLAG + pattern) for name, pattern in self.section_patterns.items()
+        }
+        
+        # Section patterns paired with their importance, resolved once per document
+        # type; types without adjustments share the default (None) plan
+        self._section_plans = {
+            document_type: [
+                (section_type, pattern, self._assess_section_importance(section_type, document_type))
+                for section_type, pattern in self.section_patterns.items()
+            ]
+            for document_type in [None, *CRITICAL_SECTIONS_BY_DOCUMENT_TYPE]
         }
         
         # Risk indicators
         self.risk_patterns = {
-            "automatic_renewal": r"(?i)(automatic|auto).{0,50}(renew|extend)",
-            "penalty_clauses": r"(?i)(penalty|fine|liquidated damages)",
-            "broad_liability": r"(?i)(unlimited liability|all damages|any loss)",
-            "indemnification": r"(?i)(indemnif|hold harmless)",
-            "waiver_of_rights": r"(?i)(waive|waiver).{0,30}(right|claim)",
-            "binding_arbitration": r"(?i)(binding arbitration|mandatory arbitration)",
-            "choice_of_law": r"(?i)(governed by|choice of law|applicable law)",
-            "attorney_fees": r"(?i)(attorney.{0,10}fee|legal fee|court cost)"
+            "automatic_renewal": r"(automatic|auto).{0,50}(renew|extend)",
+            "penalty_clauses": r"(penalty|fine|liquidated damages)",
+            "broad_liability": r"(unlimited liability|all damages|any loss)",
+            "indemnification": r"(indemnif|hold harmless)",
+            "waiver_of_rights": r"(waive|waiver).{0,30}(right|claim)",
+            "binding_arbitration": r"(binding arbitration|mandatory arbitration)",
+            "choice_of_law": r"(governed by|choice of law|applicable law)",
+            "attorney_fees": r"(attorney.{0,10}fee|legal fee|court cost)"
+        }
+        self.risk_patterns = {
+            name: SCAN_RE.compile(SCAN_CASE_FLAG + pattern) for name, pattern in self.risk_patterns.items()
         }
         
         # Important date patterns
         self.date_patterns = [
-            r"(?i)(due|expires?|expiration|deadline|by|before|within)\s+(\d{1,2}\/\d{1,2}\/\d{2,4}|\d{1,2}-\d{1,2}-\d{2,4}|\w+\s+\d{1,2},?\s+\d{4})",
-            r"(?i)(\d{1,2})\s+(days?|weeks?|months?|years?)\s+(from|after|before)",
-            r"(?i)(annually|monthly|quarterly|weekly)\s+(on|by)"
+            r"(due|expires?|expiration|deadline|by|before|within)\s+(\d{1,2}\/\d{1,2}\/\d{2,4}|\d{1,2}-\d{1,2}-\d{2,4}|\w+\s+\d{1,2},?\s+\d{4})",
+            r"(\d{1,2})\s+(days?|weeks?|months?|years?)\s+(from|after|before)",
+            r"(annually|monthly|quarterly|weekly)\s+(on|by)"
+        ]
+        self.date_patterns = [SCAN_RE.compile(SCAN_CASE_FLAG + pattern) for pattern in self.date_patterns]
+        
+        # Common legal terms to look for
+        legal_terms = [
+            "indemnify", "indemnification", "liability", "arbitration", "force majeure",
+            "liquidated damages", "breach", "default", "waiver", "severability",
+            "intellectual property", "confidentiality", "non-disclosure", "governing law",
+            "jurisdiction", "covenant", "warranty", "representations", "assignment"
         ]
+        self._legal_term_regexes = [
+            (term, SCAN_RE.compile(SCAN_CASE_FLAG + r'\b' + re.escape(term) + r'\b'))
+            for term in legal_terms
+        ]
+        
+        # Simple party identification, one group per kind of party. Matched against
+        # the original text since the matches themselves are reported.
+        self._party_re = SCAN_RE.compile(
+            r"(?i)(?P<organization>company|corporation|llc|inc\.?|ltd\.?)"
+            r"|(?P<role>client|customer|user|member|tenant|employee|contractor)"
+        )
+        
+        # Content cues for inferring a document's purpose, checked in order
+        self._purpose_patterns = [
+            (SCAN_RE.compile(SCAN_CASE_FLAG + r"(rent|lease|premises|landlord|tenant)"), "Property rental agreement"),
+            (SCAN_RE.compile(SCAN_CASE_FLAG + r"(employ|job|salary|wage|benefits)"), "Employment agreement"),
+            (SCAN_RE.compile(SCAN_CASE_FLAG + r"(privacy|data|personal information)"), "Privacy policy")
+        ]
+        
+        # Presence check for every scan category in one pass over the document,
+        # so patterns absent from it are never scanned on their own
+        self._scan_categories = {
+            "sections": list(self.section_patterns.values()),
+            "risks": list(self.risk_patterns.values()),
+            "dates": self.date_patterns,
+            "legal_terms": [pattern for _, pattern in self._legal_term_regexes],
+            "purposes": [pattern for pattern, _ in self._purpose_patterns]
+        }
+        self._scan_set = _compile_pattern_set(
+            pattern for patterns in self._scan_categories.values() for pattern in patterns
+        )
+        
+        # Header detection in structure analysis: numbered or capitalized lines
+        self._header_re = re.compile(r'^(?:\d+\.|[A-Z][^a-z]*$)')
     
-    async def analyze_document(self, content: str, document_type: Optional[str] = None) -> Dict:
+    @functools.cached_property
+    def nlp(self):
+        """spaCy pipeline for NER, loaded on first use rather than at startup."""
+        if not SPACY_AVAILABLE:
+            return None
+        try:
+            return spacy.load("en_core_web_sm", disable=SPACY_DISABLED_PIPES)
+        except OSError:
+            logger.warning("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
+            return None
+    
+    async def analyze_documents_batch(self, contents: List[str], document_type: Optional[str] = None) -> List[Dict]:
+        """
+        Analyze several documents, running spaCy over them as one batch.
+        
+        Args:
+            contents: Document text contents
+            document_type: Type of the documents for specialized analysis
+            
+        Returns:
+            Analysis results, in the same order as contents
+        """
+        nlp_docs = await asyncio.to_thread(self._parse_openings, contents)
+        
+        return await asyncio.gather(*(
+            self.analyze_document(content, document_type, nlp_doc=nlp_doc)
+            for content, nlp_doc in zip(contents, nlp_docs)
+        ))
+    
+    def _parse_openings(self, contents: List[str]) -> List:
+        """Run spaCy over each document's opening, loading the model if needed."""
+        if not self.nlp:
+            return [None] * len(contents)
+        openings = [content[:PARTY_SCAN_CHARS] for content in contents]
+        return list(self.nlp.pipe(openings, batch_size=SPACY_BATCH_SIZE))
+    
+    async def analyze_document(self, content: str, document_type: Optional[str] = None, nlp_doc=None) -> Dict:
         """
         Perform comprehensive document analysis.
         
         Args:
             content: Document text content
             document_type: Type of document for specialized analysis
+            nlp_doc: spaCy Doc for the document's opening, when already parsed in a batch
             
         Returns:
             Complete analysis results
         """
+        cache_key = (
+            hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest(),
+            document_type
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
+            folded = _fold_for_scan(content)
+            present = await asyncio.to_thread(self._patterns_present, folded)
+            
+            # The analyses are independent: CPU-bound scans run in worker threads so the
+            # event loop stays free, and they overlap with the summary's model call
+            (
+                document_structure, readability, key_sections, risk_assessment,
+                important_dates, legal_terms, (summary, summary_generated)
+            ) = await asyncio.gather(
+                asyncio.to_thread(self._analyze_structure, content),
+                asyncio.to_thread(self._analyze_readability, content),
+                asyncio.to_thread(self._identify_key_sections, content, folded, document_type, present["sections"]),
+                asyncio.to_thread(self._assess_risks, folded, present["risks"]),
+                asyncio.to_thread(self._extract_dates, content, folded, present["dates"]),
+                asyncio.to_thread(self._extract_legal_terms, content, folded, present["legal_terms"]),
+                self._generate_summary(content, folded, document_type, nlp_doc, present["purposes"])
+            )
+            
             analysis_results = {
-                "document_structure": await self._analyze_structure(content),
-                "readability": self._analyze_readability(content),
-                "key_sections": await self._identify_key_sections(content, document_type),
-                "risk_assessment": await self._assess_risks(content),
-                "important_dates": self._extract_dates(content),
-                "legal_terms": await self._extract_legal_terms(content),
-                "summary": await self._generate_summary(content, document_type),
+                "document_structure": document_structure,
+                "readability": readability,
+                "key_sections": key_sections,
+                "risk_assessment": risk_assessment,
+                "important_dates": important_dates,
+                "legal_terms": legal_terms,
+                "summary": summary,
                 "analysis_timestamp": datetime.utcnow().isoformat()
             }
             
+            # A fallback summary is not cached, so a retry can pick up the real one
+            if summary_generated:
+                self._cache_put(cache_key, analysis_results)
             return analysis_results
             
         except Exception as e:
             logger.error(f"Document analysis failed: {str(e)}")
             return self._fallback_analysis(content)
     
-    async def _analyze_structure(self, content: str) -> Dict:
-        """Analyze document structure and organization."""
-        if NLTK_AVAILABLE:
-            sentences = sent_tokenize(content)
-            word_count = len(word_tokenize(content))
-        else:
-            # Simple fallback
-            sentences = content.split('.')
-            word_count = len(content.split())
+    def _cache_get(self, key: Tuple[bytes, Optional[str]]) -> Optional[Dict]:
+        """Return a cached analysis if it has not expired, marking it recently used."""
+        entry = self._analysis_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, analysis = entry
+        if expires_at < time.monotonic():
+            del self._analysis_cache[key]
+            return None
+        self._analysis_cache.move_to_end(key)
+        return analysis
+    
+    def _cache_put(self, key: Tuple[bytes, Optional[str]], analysis: Dict):
+        """Store an analysis, evicting the least recently used entry when full."""
+        self._analysis_cache[key] = (time.monotonic() + ANALYSIS_CACHE_TTL_SECONDS, analysis)
+        self._analysis_cache.move_to_end(key)
+        if len(self._analysis_cache) > ANALYSIS_CACHE_MAX_ENTRIES:
+            self._analysis_cache.popitem(last=False)
+    
+    def resolve_contexts(self, content: str, analysis: Dict) -> Dict:
+        """
+        Fill in the context text of an analysis for serialization.
         
-        paragraphs = content.split('\n\n')
+        Analyses record each match's context as (context_start, context_end)
+        offsets into the content rather than copying the text around every
+        match; callers resolve them once, when building a response.
         
-        # Basic structure analysis
-        structure = {
-            "total_characters": len(content),
-            "total_words": word_count,
-            "total_sentences": len(sentences),
-            "total_paragraphs": len([p for p in paragraphs if p.strip()]),
-            "average_sentence_length": word_count / len(sentences) if sentences else 0,
-            "average_paragraph_length": word_count / len([p for p in paragraphs if p.strip()]) if paragraphs else 0
-        }
+        Args:
+            content: Document text content the analysis was run on
+            analysis: Result of analyze_document, which is left unchanged
+            
+        Returns:
+            A copy of the analysis with context text in place of the offsets
+        """
+        resolved = dict(analysis)
+        for key, field in (("key_sections", "content"), ("important_dates", "context"), ("legal_terms", "context")):
+            if key in analysis:
+                resolved[key] = [_resolve_context(item, content, field) for item in analysis[key]]
+        
+        risk_assessment = analysis.get("risk_assessment")
+        if risk_assessment and "risk_factors" in risk_assessment:
+            resolved["risk_assessment"] = {
+                **risk_assessment,
+                "risk_factors": [_resolve_context(item, content, "context") for item in risk_assessment["risk_factors"]]
+            }
         
-        # Identify potential headers/sections
+        return resolved
+    
+    def _analyze_structure(self, content: str) -> Dict:
+        """Analyze document structure and organization."""
+        # Splitting would copy every sentence just to count them; each break ends one
+        sentence_count = sum(1 for _ in self._sentence_break_re.finditer(content)) + 1
+        word_count = _count_words(content)
+        
+        # One pass over the lines counts paragraphs and collects headers. An
+        # exactly empty line is a blank-line ("\n\n") break; lines holding only
+        # whitespace belong to the surrounding paragraph without counting.
+        # A MULTILINE header regex was measured slower than this loop: it is
+        # tried at every character and still has to scan the whole document
+        # when there are fewer than ten headers.
+        paragraph_count = 0
+        in_paragraph = False
         potential_headers = []
         for line in content.split('\n'):
+            if not line:
+                in_paragraph = False
+                continue
             line = line.strip()
-            if line and (line.isupper() or re.match(r'^\d+\.', line) or re.match(r'^[A-Z][^a-z]*$', line)):
+            if not line:
+                continue
+            if not in_paragraph:
+                paragraph_count += 1
+                in_paragraph = True
+            if len(potential_headers) < 10 and (line.isupper() or self._header_re.match(line)):
                 potential_headers.append(line)
         
-        structure["potential_sections"] = potential_headers[:10]  # Limit to first 10
+        # Basic structure analysis
+        structure = {
+            "total_characters": len(content),
+            "total_words": word_count,
+            "total_sentences": sentence_count,
+            "total_paragraphs": paragraph_count,
+            "average_sentence_length": word_count / sentence_count,
+            "average_paragraph_length": word_count / paragraph_count if paragraph_count else 0
+        }
+        
+        structure["potential_sections"] = potential_headers  # Limited to first 10
         
         return structure
     
     def _analyze_readability(self, content: str) -> Dict:
         """Analyze document readability metrics."""
         try:
-            if TEXTSTAT_AVAILABLE:
-                flesch_score = flesch_reading_ease(content)
-                fk_grade = flesch_kincaid_grade(content)
+            if self._hyphenator is not None:
+                # Both scores come from one set of counts
+                word_count, sentence_count, syllable_count = self._readability_counts(content)
+                avg_sentence_length = _legacy_round(word_count / sentence_count, 1)
+                avg_syllables_per_word = _legacy_round(syllable_count / word_count, 1) if word_count else 0.0
+                flesch_score = _legacy_round(206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables_per_word, 2)
+                fk_grade = _legacy_round(0.39 * avg_sentence_length + 11.8 * avg_syllables_per_word - 15.59, 1)
             else:
                 # Simple fallback based on sentence and word length
-                sentences = content.split('.')
-                words = content.split()
-                avg_sentence_length = len(words) / len(sentences) if sentences else 0
+                avg_sentence_length = _count_words(content) / (content.count('.') + 1)
                 
                 # Rough estimation
                 if avg_sentence_length < 10:
@@ -218,36 +514,86 @@ class DocumentAnalysisService:
                 "complexity_assessment": "High"
             }
     
-    async def _identify_key_sections(self, content: str, document_type: Optional[str]) -> List[Dict]:
-        """Identify key sections in the document."""
-        sections = []
+    def _readability_counts(self, content: str) -> Tuple[int, int, int]:
+        """
+        Count words, sentences and syllables the way textstat does for English.
         
-        # Find sections based on patterns
-        for section_type, pattern in self.section_patterns.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
+        Args:
+            content: Document text content
+            
+        Returns:
+            Word, sentence and syllable counts; the sentence count is at least 1
+        """
+        # One tokenization serves both counts. Lowercasing never changes which
+        # characters are word characters or whitespace, so the tally of distinct
+        # lowercase words adds up to the word count.
+        words = Counter(self._punctuation_re.sub("", content.lower()).split())
+        word_count = sum(words.values())
+        
+        # Documents repeat most of their vocabulary, so each distinct word is hyphenated once
+        positions = self._hyphenator.positions
+        syllable_count = sum((len(positions(word)) + 1) * occurrences for word, occurrences in words.items())
+        
+        # Fragments of two words or fewer do not count as sentences
+        sentences = self._readability_sentence_re.findall(content)
+        short = sum(1 for sentence in sentences if len(self._punctuation_re.sub("", sentence).split()) <= 2)
+        sentence_count = max(1, len(sentences) - short)
+        
+        return word_count, sentence_count, syllable_count
+    
+    def _identify_key_sections(
+        self, content: str, folded: str, document_type: Optional[str], present: Optional[set] = None
+    ) -> List[Dict]:
+        """Identify key sections in the document, scanning its folded text."""
+        sections = []
+        cutoff = None  # Position of the last section kept, once the budget is full
+        
+        # Find sections based on patterns, with importance already resolved for the document type
+        plan = self._section_plans.get(document_type, self._section_plans[None])
+        for index, (section_type, pattern, importance) in enumerate(plan):
+            if present is not None and index not in present:
+                continue
+            matches = islice(pattern.finditer(folded), MAX_KEY_SECTIONS)
             
             for match in matches:
                 start_pos = match.start()
                 
-                # Extract context around the match
-                context_start = max(0, start_pos - 200)
-                context_end = min(len(content), start_pos + 500)
-                context = content[context_start:context_end]
-                
-                # Determine importance based on section type and document type
-                importance = self._assess_section_importance(section_type, document_type)
+                # Matches come in position order, so once one falls at or past the
+                # cutoff it and every later match would sort after the kept sections
+                if cutoff is not None and start_pos >= cutoff:
+                    break
                 
                 sections.append({
                     "section_type": section_type,
-                    "content": context.strip(),
+                    # Context around the match, resolved to "content" by resolve_contexts()
+                    "context_start": max(0, start_pos - 200),
+                    "context_end": min(len(content), start_pos + 500),
                     "start_position": start_pos,
                     "importance_level": importance,
-                    "match_text": match.group()
+                    "match_text": content[match.start():match.end()]
                 })
+            
+            if len(sections) >= MAX_KEY_SECTIONS:
+                sections.sort(key=lambda x: x["start_position"])
+                del sections[MAX_KEY_SECTIONS:]
+                cutoff = sections[-1]["start_position"]
         
         # Sort by position and limit results
         sections.sort(key=lambda x: x["start_position"])
-        return sections[:20]  # Limit to top 20 sections
+        return sections
+    
+    def _patterns_present(self, folded: str) -> Dict[str, Optional[set]]:
+        """Indices of each category's patterns that occur in the text, or None when every pattern must be scanned."""
+        if self._scan_set is None:
+            return dict.fromkeys(self._scan_categories)
+        
+        matched = self._scan_set.Match(folded) or ()  # Match() returns None when nothing occurs
+        present = {}
+        offset = 0
+        for category, patterns in self._scan_categories.items():
+            present[category] = {index - offset for index in matched if offset <= index < offset + len(patterns)}
+            offset += len(patterns)
+        return present
     
     def _assess_section_importance(self, section_type: str, document_type: Optional[str]) -> str:
         """Assess the importance of a section based on type and document context."""
@@ -255,15 +601,8 @@ class DocumentAnalysisService:
         medium_importance = ["rights", "dispute", "definitions"]
         
         # Document-specific importance adjustments
-        if document_type == "employment":
-            if section_type in ["obligations", "termination", "payment"]:
-                return "critical"
-        elif document_type == "lease":
-            if section_type in ["payment", "termination", "obligations"]:
-                return "critical"
-        elif document_type == "privacy_policy":
-            if section_type in ["privacy", "rights"]:
-                return "critical"
+        if section_type in CRITICAL_SECTIONS_BY_DOCUMENT_TYPE.get(document_type, ()):
+            return "critical"
         
         if section_type in high_importance:
             return "high"
@@ -272,28 +611,27 @@ class DocumentAnalysisService:
         else:
             return "low"
     
-    async def _assess_risks(self, content: str) -> Dict:
-        """Assess potential risks in the document."""
+    def _assess_risks(self, folded: str, present: Optional[set] = None) -> Dict:
+        """Assess potential risks in the document from its folded text."""
         risks = []
         risk_score = 0
         
-        for risk_type, pattern in self.risk_patterns.items():
-            matches = list(re.finditer(pattern, content, re.IGNORECASE))
+        for index, (risk_type, pattern) in enumerate(self.risk_patterns.items()):
+            if present is not None and index not in present:
+                continue
+            matches = list(islice(pattern.finditer(folded), MAX_RISK_OCCURRENCES))
             
             if matches:
                 risk_level = self._calculate_risk_level(risk_type, len(matches))
                 risk_score += risk_level
                 
                 for match in matches[:3]:  # Limit to first 3 matches per type
-                    context_start = max(0, match.start() - 100)
-                    context_end = min(len(content), match.end() + 100)
-                    context = content[context_start:context_end]
-                    
                     risks.append({
                         "risk_type": risk_type,
                         "risk_level": "high" if risk_level >= 3 else "medium" if risk_level >= 2 else "low",
                         "description": self._get_risk_description(risk_type),
-                        "context": context.strip(),
+                        "context_start": max(0, match.start() - 100),
+                        "context_end": min(len(folded), match.end() + 100),
                         "position": match.start()
                     })
         
@@ -357,61 +695,59 @@ class DocumentAnalysisService:
         
         return recommendations[:5]  # Limit to top 5 recommendations
     
-    def _extract_dates(self, content: str) -> List[Dict]:
-        """Extract important dates and deadlines."""
-        dates = []
-        
-        for pattern in self.date_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            
-            for match in matches:
-                context_start = max(0, match.start() - 50)
-                context_end = min(len(content), match.end() + 50)
-                context = content[context_start:context_end]
-                
-                dates.append({
-                    "date_text": match.group(),
-                    "context": context.strip(),
-                    "position": match.start(),
-                    "type": "deadline"  # Could be enhanced to classify date types
-                })
-        
-        # Sort by position and limit results
-        dates.sort(key=lambda x: x["position"])
-        return dates[:10]
-    
-    async def _extract_legal_terms(self, content: str) -> List[Dict]:
-        """Extract and explain legal terms found in the document."""
-        # Common legal terms to look for
-        legal_terms = [
-            "indemnify", "indemnification", "liability", "arbitration", "force majeure",
-            "liquidated damages", "breach", "default", "waiver", "severability",
-            "intellectual property", "confidentiality", "non-disclosure", "governing law",
-            "jurisdiction", "covenant", "warranty", "representations", "assignment"
+    def _extract_dates(self, content: str, folded: str, present: Optional[set] = None) -> List[Dict]:
+        """Extract important dates and deadlines, scanning the document's folded text."""
+        # Each pattern's matches arrive in position order; merging the streams lazily
+        # yields the earliest dates first (ties in pattern order), so scanning stops
+        # as soon as the first MAX_IMPORTANT_DATES of them are known
+        streams = [
+            pattern.finditer(folded)
+            for index, pattern in enumerate(self.date_patterns)
+            if present is None or index in present
         ]
-        
+        matches = islice(heapq.merge(*streams, key=lambda match: match.start()), MAX_IMPORTANT_DATES)
+        
+        return [
+            {
+                "date_text": content[match.start():match.end()],
+                "context_start": max(0, match.start() - 50),
+                "context_end": min(len(content), match.end() + 50),
+                "position": match.start(),
+                "type": "deadline"  # Could be enhanced to classify date types
+            }
+            for match in matches
+        ]
+    
+    def _extract_legal_terms(self, content: str, folded: str, present: Optional[set] = None) -> List[Dict]:
+        """Extract and explain legal terms found in the document, scanning its folded text."""
         found_terms = []
         
-        for term in legal_terms:
-            pattern = r'\b' + re.escape(term) + r'\b'
-            matches = re.finditer(pattern, content, re.IGNORECASE)
+        for index, (term, pattern) in enumerate(self._legal_term_regexes):
+            if present is not None and index not in present:
+                continue
+            match = pattern.search(folded)  # Only capture first occurrence of each term
             
-            for match in matches:
-                context_start = max(0, match.start() - 100)
-                context_end = min(len(content), match.end() + 100)
-                context = content[context_start:context_end]
-                
+            if match:
                 found_terms.append({
-                    "term": match.group(),
-                    "context": context.strip(),
+                    "term": content[match.start():match.end()],
+                    "context_start": max(0, match.start() - 100),
+                    "context_end": min(len(content), match.end() + 100),
                     "position": match.start()
                 })
-                break  # Only capture first occurrence of each term
+                if len(found_terms) == MAX_LEGAL_TERMS:
+                    break
         
-        return found_terms[:15]  # Limit to 15 terms
+        return found_terms
     
-    async def _generate_summary(self, content: str, document_type: Optional[str]) -> Dict:
-        """Generate an AI-powered summary of the document."""
+    async def _generate_summary(
+        self, content: str, folded: str, document_type: Optional[str], nlp_doc=None, purposes_present: Optional[set] = None
+    ) -> Tuple[Dict, bool]:
+        """
+        Generate an AI-powered summary of the document.
+        
+        Returns:
+            The summary, and whether it came from the model rather than a fallback
+        """
         try:
             # Create summary prompt based on document type
             summary_prompt = f"Provide a brief summary of this legal document"
@@ -422,19 +758,24 @@ class DocumentAnalysisService:
             # Use first 2000 characters for summary to avoid token limits
             content_preview = content[:2000] + "..." if len(content) > 2000 else content
             
-            summary_result = await self.translation_engine.translate_legal_text(
-                content_preview,
-                complexity_level="high_school",
-                context=summary_prompt
+            # NER (and the first spaCy model load) runs in a worker thread
+            # while the model call is in flight
+            summary_result, main_parties = await asyncio.gather(
+                self.translation_engine.translate_legal_text(
+                    content_preview,
+                    complexity_level="high_school",
+                    context=summary_prompt
+                ),
+                asyncio.to_thread(self._identify_parties, content, nlp_doc)
             )
             
             return {
                 "brief_summary": summary_result.get("simplified_text", "Summary not available"),
                 "key_points": summary_result.get("key_points", []),
-                "main_parties": self._identify_parties(content),
-                "document_purpose": self._infer_document_purpose(content, document_type),
+                "main_parties": main_parties,
+                "document_purpose": self._infer_document_purpose(folded, document_type, purposes_present),
                 "confidence_score": summary_result.get("confidence_score", 0.7)
-            }
+            }, summary_result.get("model_used") != "fallback"
             
         except Exception as e:
             logger.error(f"Summary generation failed: {str(e)}")
@@ -444,25 +785,31 @@ class DocumentAnalysisService:
                 "main_parties": [],
                 "document_purpose": "Unknown",
                 "confidence_score": 0.0
-            }
+            }, False
     
-    def _identify_parties(self, content: str) -> List[str]:
+    def _identify_parties(self, content: str, nlp_doc=None) -> List[str]:
         """Identify the main parties in the document."""
-        # Simple party identification - could be enhanced with NER
-        party_patterns = [
-            r"(?i)(company|corporation|llc|inc\.?|ltd\.?)",
-            r"(?i)(client|customer|user|member|tenant|employee|contractor)"
-        ]
-        
-        parties = []
-        for pattern in party_patterns:
-            matches = re.findall(pattern, content[:1000])  # Check first 1000 chars
-            parties.extend(matches[:2])  # Limit to 2 per pattern
-        
-        return list(set(parties))[:5]  # Remove duplicates and limit
+        # Named organisations and people, when spaCy's NER is available
+        if nlp_doc is None and self.nlp:
+            nlp_doc = self.nlp(content[:PARTY_SCAN_CHARS])
+        if nlp_doc is not None:
+            parties = [ent.text for ent in nlp_doc.ents if ent.label_ in SPACY_PARTY_LABELS]
+            if parties:
+                return list(dict.fromkeys(parties))[:5]
+        
+        # Simple party identification, stopping once both kinds have two mentions
+        mentions = {"organization": [], "role": []}
+        for match in self._party_re.finditer(content[:PARTY_SCAN_CHARS]):
+            found = mentions[match.lastgroup]
+            if len(found) < 2:  # Limit to 2 per kind
+                found.append(match.group())
+            elif all(len(found) == 2 for found in mentions.values()):
+                break
+        
+        return list(dict.fromkeys(mentions["organization"] + mentions["role"]))[:5]  # Remove duplicates, keep order
     
-    def _infer_document_purpose(self, content: str, document_type: Optional[str]) -> str:
-        """Infer the main purpose of the document."""
+    def _infer_document_purpose(self, folded: str, document_type: Optional[str], present: Optional[set] = None) -> str:
+        """Infer the main purpose of the document from its folded text."""
         if document_type:
             purposes = {
                 "contract": "Establish contractual relationship and obligations",
@@ -476,21 +823,20 @@ class DocumentAnalysisService:
             return purposes.get(document_type, "Legal agreement")
         
         # Infer from content
-        if re.search(r"(?i)(rent|lease|premises|landlord|tenant)", content):
-            return "Property rental agreement"
-        elif re.search(r"(?i)(employ|job|salary|wage|benefits)", content):
-            return "Employment agreement"
-        elif re.search(r"(?i)(privacy|data|personal information)", content):
-            return "Privacy policy"
-        else:
-            return "Legal agreement"
+        for index, (pattern, purpose) in enumerate(self._purpose_patterns):
+            if present is not None:
+                if index in present:
+                    return purpose
+            elif pattern.search(folded):
+                return purpose
+        return "Legal agreement"
     
     def _fallback_analysis(self, content: str) -> Dict:
         """Provide fallback analysis when AI services fail."""
         return {
             "document_structure": {
                 "total_characters": len(content),
-                "total_words": len(content.split()),
+                "total_words": _count_words(content),
                 "analysis_note": "Basic structure analysis only"
             },
             "readability": {
@@ -509,4 +855,8 @@ class DocumentAnalysisService:
                 "analysis_note": "Please try again later"
             },
             "analysis_timestamp": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
+
+
+# Shared instance, so the spaCy model and the analysis cache exist once per process
+document_analysis_service = DocumentAnalysisService()
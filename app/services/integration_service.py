@@ -6,9 +6,12 @@ Handles DocuSign, Microsoft 365, Google Workspace, and webhook integrations
 import asyncio
 import json
 import base64
+import random
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
+from collections import defaultdict
 import httpx
 
 from app.models.schemas import DocuSignRequest, WebhookEvent
@@ -24,6 +27,11 @@ class IntegrationService:
         self.google_client = GoogleWorkspaceClient()
         self.webhook_manager = WebhookManager()
         
+    async def cleanup(self):
+        """Close pooled webhook connections"""
+        await self.webhook_manager.aclose()
+        logger.info("Integration service cleanup complete")
+        
     async def send_to_docusign(self, document_id: str, recipients: List[str], 
                              user_id: str) -> Dict[str, Any]:
         """Send document to DocuSign for e-signature"""
@@ -81,7 +89,8 @@ class IntegrationService:
             logger.error(f"Google Workspace integration error: {e}")
             raise
     
-    async def trigger_webhook(self, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def trigger_webhook(self, event_type: str, payload: Dict[str, Any],
+                            batched: bool = False) -> Dict[str, Any]:
         """Trigger webhook for external notifications"""
         try:
             webhook_event = WebhookEvent(
@@ -91,7 +100,7 @@ class IntegrationService:
                 timestamp=datetime.utcnow()
             )
             
-            result = await self.webhook_manager.send_webhook(webhook_event)
+            result = await self.webhook_manager.send_webhook(webhook_event, batched=batched)
             return result
             
         except Exception as e:
@@ -440,12 +449,52 @@ class WebhookManager:
         self.webhook_endpoints = {}
         self.retry_config = {
             "max_retries": 3,
-            "retry_delay": 5,  # seconds
+            "backoff_base": 0.5,  # seconds, doubled on every attempt
+            "backoff_cap": 30,  # seconds
             "timeout": 30
         }
+        # One pooled client for every endpoint and retry, so keep-alive
+        # connections are reused instead of re-handshaking per attempt
+        self._client = httpx.AsyncClient(
+            timeout=self.retry_config["timeout"],
+            limits=httpx.Limits(
+                max_keepalive_connections=50,
+                max_connections=200,
+                keepalive_expiry=30
+            )
+        )
+        # Batched events are coalesced per event type and posted together
+        # once a size threshold is hit or the flush interval elapses
+        self.batch_config = {
+            "max_events": 100,
+            "max_bytes": 1_000_000,
+            "flush_interval": 2.0  # seconds
+        }
+        self._buffer: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._buffer_bytes: Dict[str, int] = defaultdict(int)
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def aclose(self):
+        """Flush buffered events and close the pooled HTTP client"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_all()
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
     
-    async def send_webhook(self, webhook_event: WebhookEvent) -> Dict[str, Any]:
-        """Send webhook to registered endpoints"""
+    async def send_webhook(self, webhook_event: WebhookEvent,
+                         batched: bool = False) -> Dict[str, Any]:
+        """Send webhook to registered endpoints, or buffer it when batched"""
         try:
             # Get registered webhooks for this event type
             endpoints = self.webhook_endpoints.get(webhook_event.event_type, [])
@@ -454,11 +503,12 @@ class WebhookManager:
                 logger.info(f"No webhook endpoints registered for event: {webhook_event.event_type}")
                 return {"sent": False, "reason": "no_endpoints"}
             
-            results = []
+            payload = self._build_payload(webhook_event)
             
-            for endpoint in endpoints:
-                result = await self._send_to_endpoint(endpoint, webhook_event)
-                results.append(result)
+            if batched:
+                return await self._buffer_event(webhook_event.event_type, payload)
+            
+            results = await self._deliver(endpoints, payload)
             
             return {
                 "sent": True,
@@ -476,53 +526,182 @@ class WebhookManager:
                 "timestamp": datetime.utcnow().isoformat()
             }
     
-    async def _send_to_endpoint(self, endpoint: Dict[str, Any], 
-                              webhook_event: WebhookEvent) -> Dict[str, Any]:
-        """Send webhook to specific endpoint with retries"""
-        url = endpoint.get("url")
-        headers = endpoint.get("headers", {})
-        headers["Content-Type"] = "application/json"
+    async def _buffer_event(self, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a payload for batched delivery, flushing when the batch is full"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        self._buffer[event_type].append(payload)
+        self._buffer_bytes[event_type] += len(json.dumps(payload))
         
-        payload = {
+        if (len(self._buffer[event_type]) >= self.batch_config["max_events"]
+                or self._buffer_bytes[event_type] >= self.batch_config["max_bytes"]):
+            return await self._flush_event_type(event_type)
+        
+        return {
+            "sent": False,
+            "queued": True,
+            "event_type": event_type,
+            "buffered_events": len(self._buffer[event_type]),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    async def _flush_loop(self):
+        """Periodically flush buffered events that never filled a batch"""
+        while True:
+            await asyncio.sleep(self.batch_config["flush_interval"])
+            try:
+                await self._flush_all()
+            except Exception as e:
+                logger.error(f"Webhook batch flush failed: {e}")
+    
+    async def _flush_all(self):
+        """Flush every buffered event type"""
+        for event_type in list(self._buffer):
+            await self._flush_event_type(event_type)
+    
+    async def _flush_event_type(self, event_type: str) -> Dict[str, Any]:
+        """Post all buffered events of one type as a single batch per endpoint"""
+        events = self._buffer.pop(event_type, [])
+        self._buffer_bytes.pop(event_type, None)
+        endpoints = self.webhook_endpoints.get(event_type, [])
+        
+        if not events or not endpoints:
+            if events:
+                logger.info(f"Dropping {len(events)} batched events for unregistered event: {event_type}")
+            return {"sent": False, "reason": "no_endpoints" if events else "empty_batch"}
+        
+        results = await self._deliver(endpoints, {"event_type": event_type, "events": events})
+        
+        return {
+            "sent": True,
+            "batched": True,
+            "event_type": event_type,
+            "events_sent": len(events),
+            "endpoints_notified": len(endpoints),
+            "results": results,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    async def _deliver(self, endpoints: List[Dict[str, Any]],
+                       payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Post a payload to all endpoints concurrently"""
+        # A failure on one endpoint is reported in its own result
+        # instead of aborting the others
+        outcomes = await asyncio.gather(
+            *(self._send_to_endpoint(endpoint, payload) for endpoint in endpoints),
+            return_exceptions=True
+        )
+        
+        return [
+            {
+                "endpoint": endpoint.get("url"),
+                "status": "failed",
+                "attempts": 0,
+                "last_error": str(outcome)
+            } if isinstance(outcome, Exception) else outcome
+            for endpoint, outcome in zip(endpoints, outcomes)
+        ]
+    
+    @staticmethod
+    def _build_payload(webhook_event: WebhookEvent) -> Dict[str, Any]:
+        """Build the JSON body delivered for a single event"""
+        return {
             "event_type": webhook_event.event_type,
             "source": webhook_event.source,
             "payload": webhook_event.payload,
             "timestamp": webhook_event.timestamp.isoformat(),
             "webhook_id": f"wh_{int(datetime.utcnow().timestamp())}"
         }
+    
+    async def _send_to_endpoint(self, endpoint: Dict[str, Any], 
+                              payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send webhook payload to specific endpoint with retries"""
+        url = endpoint.get("url")
+        headers = endpoint.get("headers", {})
+        headers["Content-Type"] = "application/json"
+        
+        max_retries = self.retry_config["max_retries"]
+        last_error = "Max retries exceeded"
         
-        for attempt in range(self.retry_config["max_retries"]):
+        for attempt in range(max_retries):
+            retry_after = None
             try:
-                async with httpx.AsyncClient(timeout=self.retry_config["timeout"]) as client:
-                    response = await client.post(
+                # Bound the whole attempt in place; unlike wait_for this does
+                # not wrap the request in a new task
+                async with asyncio.timeout(self.retry_config["timeout"]):
+                    response = await self._client.post(
                         url,
                         json=payload,
                         headers=headers
                     )
-                    
-                    if response.status_code in [200, 201, 202]:
-                        return {
-                            "endpoint": url,
-                            "status": "success",
-                            "status_code": response.status_code,
-                            "attempt": attempt + 1
-                        }
-                    else:
-                        logger.warning(f"Webhook endpoint returned {response.status_code}: {url}")
+                
+                if response.status_code in [200, 201, 202]:
+                    return {
+                        "endpoint": url,
+                        "status": "success",
+                        "status_code": response.status_code,
+                        "attempt": attempt + 1
+                    }
+                
+                logger.warning(f"Webhook endpoint returned {response.status_code}: {url}")
+                last_error = f"HTTP {response.status_code}"
+                
+                # Client errors will not succeed on retry, except rate limiting
+                if response.status_code < 500 and response.status_code != 429:
+                    return {
+                        "endpoint": url,
+                        "status": "failed",
+                        "status_code": response.status_code,
+                        "attempts": attempt + 1,
+                        "last_error": last_error
+                    }
+                retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
                         
-            except Exception as e:
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                logger.warning(f"Webhook attempt {attempt + 1} timed out for {url}")
+                last_error = "Timed out"
+                        
+            except httpx.TransportError as e:
                 logger.warning(f"Webhook attempt {attempt + 1} failed for {url}: {e}")
-                
-                if attempt < self.retry_config["max_retries"] - 1:
-                    await asyncio.sleep(self.retry_config["retry_delay"])
+                last_error = str(e)
+            
+            if attempt < max_retries - 1:
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
         
         return {
             "endpoint": url,
             "status": "failed",
-            "attempts": self.retry_config["max_retries"],
-            "last_error": "Max retries exceeded"
+            "attempts": max_retries,
+            "last_error": last_error
         }
     
+    def _retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the next attempt"""
+        cap = self.retry_config["backoff_cap"]
+        if retry_after is not None:
+            return min(cap, retry_after)
+        # Exponential backoff with jitter so failing senders do not retry in lockstep
+        delay = min(cap, self.retry_config["backoff_base"] * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    
     async def register_webhook(self, event_type: str, url: str, 
                              headers: Dict[str, str] = None) -> Dict[str, Any]:
         """Register webhook endpoint for event type"""
@@ -0,0 +1,37 @@
+"""
+Tests for OCR post-processing in the document processor
+"""
+
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.document_processor import DocumentProcessor
+
+def _postprocess(text):
+    return DocumentProcessor()._postprocess_structured(text)
+
+def test_bates_letter_o_read_as_zero():
+    """Letter O inside a known Bates stamp's digit run becomes zero"""
+    assert _postprocess("DEFOOO1234") == "DEF0001234"
+    assert _postprocess("DEF-OOO123") == "DEF-000123"
+
+def test_bates_stamp_not_joined_with_following_year():
+    """A year after a stamp stays a separate number"""
+    assert _postprocess("PROD0001 2023") == "PROD0001 2023"
+
+def test_bates_stamp_not_joined_with_following_count():
+    """A page count after a stamp stays a separate number"""
+    assert _postprocess("See PL000123 45 pages") == "See PL000123 45 pages"
+
+def test_unknown_prefixes_left_alone():
+    """All-caps tokens ending in digits are not treated as Bates stamps"""
+    assert _postprocess("COVID19 2020 cases") == "COVID19 2020 cases"
+    assert _postprocess("INV2024 10 15") == "INV2024 10 15"
+    assert _postprocess("MD5 1234 5678") == "MD5 1234 5678"
+
+def test_letter_o_in_numbers():
+    """Letter O inside amounts and years becomes zero"""
+    assert _postprocess("Paid $1O,OOO in 2O24") == "Paid $10,000 in 2024"
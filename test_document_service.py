@@ -0,0 +1,174 @@
+"""
+Tests for the document analysis service
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.document_service import DocumentAnalysisService
+
+CONTRACT_TEXT = """SERVICE AGREEMENT
+
+1. Payment Terms
+The Client shall pay the Provider within 30 days of invoice.
+
+2. Termination
+Either party may terminate this agreement with written notice.
+"""
+
+def _summary_returning(result):
+    """Stand-in for translate_legal_text that returns a fixed result"""
+    calls = []
+
+    async def translate_legal_text(text, complexity_level="high_school", context=None):
+        calls.append(text)
+        return result
+
+    return translate_legal_text, calls
+
+def test_fallback_summary_is_not_cached():
+    """A failed AI summary must not be served from the cache on retry"""
+    service = DocumentAnalysisService()
+    fallback, fallback_calls = _summary_returning({
+        "simplified_text": CONTRACT_TEXT,
+        "key_points": ["Unable to process with AI - original text preserved"],
+        "confidence_score": 0.0,
+        "model_used": "fallback"
+    })
+    service.translation_engine.translate_legal_text = fallback
+
+    asyncio.run(service.analyze_document(CONTRACT_TEXT, "contract"))
+    assert len(fallback_calls) == 1
+
+    generated, generated_calls = _summary_returning({
+        "simplified_text": "The client pays within 30 days.",
+        "key_points": ["Pay within 30 days"],
+        "confidence_score": 0.9,
+        "model_used": "gpt-4"
+    })
+    service.translation_engine.translate_legal_text = generated
+
+    retried = asyncio.run(service.analyze_document(CONTRACT_TEXT, "contract"))
+    assert len(generated_calls) == 1
+    assert retried["summary"]["brief_summary"] == "The client pays within 30 days."
+
+    # A real summary is cached for the next identical request
+    again = asyncio.run(service.analyze_document(CONTRACT_TEXT, "contract"))
+    assert len(generated_calls) == 1
+    assert again is retried
+
+def test_summary_exception_is_not_cached():
+    """A summary that raised falls back and is recomputed on the next request"""
+    service = DocumentAnalysisService()
+    calls = []
+
+    async def failing_translate(text, complexity_level="high_school", context=None):
+        calls.append(text)
+        raise RuntimeError("model unavailable")
+
+    service.translation_engine.translate_legal_text = failing_translate
+
+    first = asyncio.run(service.analyze_document(CONTRACT_TEXT, "contract"))
+    assert first["summary"]["brief_summary"] == "Summary generation temporarily unavailable"
+    asyncio.run(service.analyze_document(CONTRACT_TEXT, "contract"))
+    assert len(calls) == 2
+
+def test_scans_fold_letters_ignorecase_maps_to_ascii():
+    """Dotted I, long s and Kelvin sign match like their ASCII letters, with or without RE2"""
+    service = DocumentAnalysisService()
+    analysis = asyncio.run(service.analyze_document(
+        "The Tenant shall İndemnify the Landlord and waiſe no claim.\n", None
+    ))
+    assert [term["term"] for term in analysis["legal_terms"]] == ["İndemnify"]
+    risk_types = [factor["risk_type"] for factor in analysis["risk_assessment"]["risk_factors"]]
+    assert "indemnification" in risk_types
+
+# Flesch scores from textstat 0.7.3, which _analyze_readability reimplements
+READABILITY_TEXTS = {
+    "simple": "The cat sat on the mat. It was happy. The sun was warm.",
+    "legal": (
+        "Notwithstanding the foregoing, the Indemnifying Party shall indemnify, defend and hold "
+        "harmless the Indemnified Party from any and all liabilities, damages, and expenses, "
+        "including reasonable attorneys' fees, arising out of or relating to any breach hereof. "
+        "This Agreement shall be governed by the laws of the State of New York."
+    ),
+}
+
+def test_readability_matches_textstat():
+    """Flesch reading ease and Flesch-Kincaid grade keep textstat 0.7.3's values"""
+    service = DocumentAnalysisService()
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_contract.txt")) as f:
+        contract = f.read()
+
+    expected = [
+        (contract, 58.58, 8.2),
+        (READABILITY_TEXTS["simple"], 109.41, -1.0),
+        (READABILITY_TEXTS["legal"], 29.18, 15.4),
+    ]
+    for text, flesch_reading_ease, flesch_kincaid_grade in expected:
+        readability = service._analyze_readability(text)
+        assert readability["flesch_reading_ease"] == flesch_reading_ease
+        assert readability["flesch_kincaid_grade"] == flesch_kincaid_grade
+
+def _many_match_document():
+    """Thirty numbered clauses, each repeating every section, risk, date and term pattern"""
+    return "\n".join(
+        f"{i + 1}. Payment terms and termination. The Tenant shall indemnify and waive rights; "
+        f"automatic renewal applies. Due {i % 12 + 1}/{i % 28 + 1}/20{10 + i}. "
+        "Arbitration, jurisdiction, force majeure, liquidated damages, severability, assignment, "
+        "confidentiality, warranty, breach, covenant, liability, default, waiver, governing law, "
+        "intellectual property, non-disclosure, representations and indemnification."
+        for i in range(30)
+    )
+
+def test_capped_scans_match_full_scans():
+    """Scans that stop at their result limits return what scanning every match did"""
+    service = DocumentAnalysisService()
+    analysis = asyncio.run(service.analyze_document(_many_match_document(), "lease"))
+
+    assert [(s["section_type"], s["start_position"]) for s in analysis["key_sections"]] == [
+        ("payment", 3), ("termination", 21), ("obligations", 45), ("rights", 71), ("dispute", 120),
+        ("force_majeure", 147), ("liability", 173), ("privacy", 208), ("liability", 253),
+        ("intellectual_property", 296), ("payment", 375), ("termination", 393), ("obligations", 417),
+        ("rights", 443), ("dispute", 492), ("force_majeure", 519), ("liability", 545), ("privacy", 580),
+        ("liability", 625), ("intellectual_property", 668),
+    ]
+    assert [(d["date_text"], d["position"]) for d in analysis["important_dates"]] == [
+        ("Due 1/1/2010", 106), ("Due 2/2/2011", 478), ("Due 3/3/2012", 850), ("Due 4/4/2013", 1222),
+        ("Due 5/5/2014", 1594), ("Due 6/6/2015", 1966), ("Due 7/7/2016", 2338), ("Due 8/8/2017", 2710),
+        ("Due 9/9/2018", 3082), ("Due 10/10/2019", 3455),
+    ]
+    assert [(t["term"], t["position"]) for t in analysis["legal_terms"]] == [
+        ("indemnify", 51), ("indemnification", 355), ("liability", 253), ("Arbitration", 120),
+        ("force majeure", 147), ("liquidated damages", 162), ("breach", 235), ("default", 264),
+        ("waiver", 273), ("severability", 182), ("intellectual property", 296), ("confidentiality", 208),
+        ("non-disclosure", 319), ("governing law", 281), ("jurisdiction", 133),
+    ]
+    risk = analysis["risk_assessment"]
+    assert (risk["risk_score"], risk["overall_risk"]) == (20, "high")
+    assert [(f["risk_type"], f["risk_level"], f["position"]) for f in risk["risk_factors"]] == [
+        ("automatic_renewal", "high", 79), ("automatic_renewal", "high", 451), ("automatic_renewal", "high", 823),
+        ("penalty_clauses", "high", 162), ("penalty_clauses", "high", 534), ("penalty_clauses", "high", 906),
+        ("indemnification", "high", 51), ("indemnification", "high", 355), ("indemnification", "high", 423),
+        ("waiver_of_rights", "high", 65), ("waiver_of_rights", "high", 437), ("waiver_of_rights", "high", 809),
+    ]
+
+def test_dates_from_different_patterns_stay_in_document_order():
+    """The ten earliest dates are kept in position order across date patterns"""
+    service = DocumentAnalysisService()
+    content = " ".join(
+        f"Rent is due {i + 1}/1/2024 and the lease expires January {i + 1}, 2025; notice within "
+        f"{i + 10} days after renewal, payable annually on March {i + 1}."
+        for i in range(8)
+    )
+    analysis = asyncio.run(service.analyze_document(content, None))
+
+    assert [(d["date_text"], d["position"]) for d in analysis["important_dates"]] == [
+        ("due 1/1/2024", 8), ("expires January 1, 2025", 35), ("10 days after", 74), ("annually on", 105),
+        ("due 2/1/2024", 134), ("expires January 2, 2025", 161), ("11 days after", 200), ("annually on", 231),
+        ("due 3/1/2024", 260), ("expires January 3, 2025", 287),
+    ]